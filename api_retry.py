@@ -0,0 +1,103 @@
+# api_retry.py
+import json
+import random
+import socket
+import threading
+import time
+import http.client
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from config import (API_RETRY_MAX_ATTEMPTS, API_RETRY_BASE_DELAY_SECONDS, API_RETRY_MAX_DELAY_SECONDS,
+                    API_RETRY_DEADLINE_SECONDS)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# 403 reasons that mean "slow down" rather than "not allowed"
+RETRYABLE_REASONS = {'quotaExceeded', 'rateLimitExceeded', 'userRateLimitExceeded'}
+# Transient transport failures only. Other httplib2 errors (RedirectMissingLocation, RelativeURIError,
+# MalformedHeader, RedirectLimit, ...) are permanent and must surface immediately.
+RETRYABLE_EXCEPTIONS = (ConnectionError, socket.timeout, TimeoutError, http.client.HTTPException,
+                        httplib2.ServerNotFoundError)
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+def http_error_reason(error):
+    try:
+        content = error.content.decode('utf-8') if isinstance(error.content, bytes) else error.content
+        return json.loads(content).get('error', {}).get('errors', [{}])[0].get('reason')
+    except Exception:
+        return None
+
+def _retry_cause(error, idempotent):
+    # Returns a short description when the error is worth retrying, else None.
+    # Non-idempotent calls are only retried when the server rejected them before doing any work.
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        reason = http_error_reason(error)
+        if reason in RETRYABLE_REASONS:
+            return f"HTTP {status} {reason}"
+        if status == 429:
+            return "HTTP 429"
+        if idempotent and status in RETRYABLE_STATUS_CODES:
+            return f"HTTP {status}"
+        return None
+    if idempotent and isinstance(error, RETRYABLE_EXCEPTIONS):
+        return type(error).__name__
+    return None
+
+def _record(operation, retries=0, backoff_seconds=0.0, failed=False):
+    with _stats_lock:
+        entry = _stats.setdefault(operation, {'calls': 0, 'retries': 0, 'backoff_seconds': 0.0, 'failures': 0})
+        entry['calls'] += 1
+        entry['retries'] += retries
+        entry['backoff_seconds'] += backoff_seconds
+        if failed:
+            entry['failures'] += 1
+
+def get_retry_stats():
+    with _stats_lock:
+        return {operation: dict(entry) for operation, entry in _stats.items()}
+
+def format_retry_stats():
+    stats = get_retry_stats()
+    if not stats:
+        return "no API calls made"
+    return ", ".join(
+        f"{op}: {e['calls']} calls, {e['retries']} retries, {e['backoff_seconds']:.1f}s backoff, {e['failures']} failed"
+        for op, e in sorted(stats.items())
+    )
+
+def call_with_retry(func, operation, log_func=print, idempotent=True, deadline_seconds=API_RETRY_DEADLINE_SECONDS,
+                    max_attempts=API_RETRY_MAX_ATTEMPTS, cancel_event=None, on_retry=None):
+    deadline = time.monotonic() + deadline_seconds
+    retries, backoff_total = 0, 0.0
+    while True:
+        try:
+            result = func()
+            _record(operation, retries, backoff_total)
+            return result
+        except Exception as error:
+            cause = _retry_cause(error, idempotent)
+            if cause is None or retries + 1 >= max_attempts:
+                # A 304 answers a conditional (ETag) request: the cached copy is still good, not a failure.
+                not_modified = isinstance(error, HttpError) and error.resp.status == 304
+                _record(operation, retries, backoff_total, failed=not not_modified)
+                raise
+            delay = random.uniform(0, min(API_RETRY_MAX_DELAY_SECONDS, API_RETRY_BASE_DELAY_SECONDS * (2 ** retries)))
+            if time.monotonic() + delay > deadline:
+                log_func(f"Retry: Giving up on {operation} after {retries} retries ({cause}); deadline reached.")
+                _record(operation, retries, backoff_total, failed=True)
+                raise
+            retries += 1
+            backoff_total += delay
+            log_func(f"Retry: {operation} failed ({cause}). Retry {retries}/{max_attempts - 1} in {delay:.1f}s.")
+            if on_retry:
+                on_retry(error)
+            if cancel_event:
+                if cancel_event.wait(timeout=delay):
+                    _record(operation, retries, backoff_total, failed=True)
+                    raise
+            else:
+                time.sleep(delay)
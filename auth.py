@@ -2,17 +2,69 @@
 import os
 import pickle
 import threading
-from tkinter import messagebox
 
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.http import HttpRequest, build_http
 
 from config import CLIENT_SECRETS_FILE, ALL_APP_SCOPES, TOKEN_PICKLE_FILE
+from discovery_store import load_discovery_document
+
+class AuthenticationError(Exception):
+    pass
 
 current_credentials = None
 auth_lock = threading.Lock()
+# False for unattended runs: a missing or revoked token then raises instead of opening a
+# browser sign-in that nobody can complete (and that would block while holding auth_lock).
+_interactive_auth = True
+
+def set_interactive_auth(enabled):
+    global _interactive_auth
+    _interactive_auth = enabled
+
+# Built discovery clients, keyed by (api_name, api_version, credential identity, scopes).
+# Only touched while holding auth_lock.
+_service_cache = {}
+# One authorized http per thread: the shared service object never shares a connection.
+_thread_http = threading.local()
+
+def _invalidate_service_cache():
+    _service_cache.clear()
+
+def _service_cache_key(api_name, api_version, creds):
+    return (api_name, api_version, id(creds), tuple(sorted(creds.scopes or [])))
+
+def _thread_authorized_http(creds):
+    # httplib2.Http is not thread-safe, so each thread gets its own authorized http. build_http()
+    # sets the client's default socket timeout and stops 308 (resumable upload "Resume Incomplete")
+    # from being followed as a redirect, as the library's own clients do.
+    authed = getattr(_thread_http, 'authed', None)
+    if authed is None or authed.credentials is not creds:
+        authed = google_auth_httplib2.AuthorizedHttp(creds, http=build_http())
+        _thread_http.authed = authed
+    return authed
+
+def _build_cached_service(api_name, api_version, creds, log_func=print):
+    key = _service_cache_key(api_name, api_version, creds)
+    service = _service_cache.get(key)
+    if service is not None:
+        return service
+
+    def request_builder(http, *args, **kwargs):
+        return HttpRequest(_thread_authorized_http(creds), *args, **kwargs)
+
+    document = load_discovery_document(api_name, api_version, log_func)
+    if document:
+        service = build_from_document(document, credentials=creds, requestBuilder=request_builder)
+    else:
+        service = build(api_name, api_version, credentials=creds, requestBuilder=request_builder)
+    _service_cache[key] = service
+    log_func(f"Service '{api_name} v{api_version}' built and cached.")
+    return service
 
 def _save_credentials(creds):
     try:
@@ -36,6 +88,14 @@ def _load_credentials():
     return None
 
 def get_authenticated_service(api_name, api_version, log_func=print):
+    # Returns None instead of raising, for callers that just skip work without a service.
+    try:
+        return require_authenticated_service(api_name, api_version, log_func)
+    except AuthenticationError as e:
+        log_func(f"Authentication unavailable: {e}")
+        return None
+
+def require_authenticated_service(api_name, api_version, log_func=print):
     global current_credentials
     with auth_lock:
         if current_credentials and current_credentials.valid:
@@ -46,6 +106,7 @@ def get_authenticated_service(api_name, api_version, log_func=print):
                 try:
                     log_func("Refreshing expired credentials...")
                     current_credentials.refresh(Request())
+                    _invalidate_service_cache()
                     _save_credentials(current_credentials)
                     log_func("Credentials refreshed successfully.")
                 except Exception as e:
@@ -58,11 +119,13 @@ def get_authenticated_service(api_name, api_version, log_func=print):
             if loaded_creds:
                 if all(s in loaded_creds.scopes for s in ALL_APP_SCOPES):
                     current_credentials = loaded_creds
+                    _invalidate_service_cache()
                     log_func("Credentials loaded from file.")
                     if current_credentials.expired and current_credentials.refresh_token:
                         try:
                             log_func("Refreshing expired loaded credentials...")
                             current_credentials.refresh(Request())
+                            _invalidate_service_cache()
                             _save_credentials(current_credentials)
                             log_func("Loaded credentials refreshed successfully.")
                         except Exception as e:
@@ -78,41 +141,27 @@ def get_authenticated_service(api_name, api_version, log_func=print):
             if not current_credentials or not current_credentials.valid:
                 if not os.path.exists(CLIENT_SECRETS_FILE):
                     log_func(f"ERROR: Client secrets file not found: {CLIENT_SECRETS_FILE}")
-                    if threading.current_thread() is threading.main_thread():
-                        messagebox.showerror("Authentication Error", f"Client secrets file '{CLIENT_SECRETS_FILE}' not found.")
-                    else:
-                        print(f"CRITICAL ERROR (non-UI thread): Client secrets file '{CLIENT_SECRETS_FILE}' not found.")
-                    return None
+                    raise AuthenticationError(f"Client secrets file '{CLIENT_SECRETS_FILE}' not found.")
+                if not _interactive_auth:
+                    log_func("ERROR: No usable saved credentials and interactive sign-in is disabled.")
+                    raise AuthenticationError(f"No valid credentials in '{TOKEN_PICKLE_FILE}'. Sign in once through the GUI to create it.")
                 try:
                     log_func("Initiating new OAuth flow...")
                     flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, ALL_APP_SCOPES)
                     current_credentials = flow.run_local_server(port=0)
+                    _invalidate_service_cache()
                     _save_credentials(current_credentials)
                     log_func("New authentication successful. Credentials saved.")
                 except Exception as e:
                     log_func(f"Authentication Error during OAuth flow: {e}")
-                    if threading.current_thread() is threading.main_thread():
-                        messagebox.showerror("Authentication Error", f"Could not authenticate: {e}")
-                    else:
-                        print(f"CRITICAL ERROR (non-UI thread): Authentication failed: {e}")
-                    return None
+                    raise AuthenticationError(f"Could not authenticate: {e}") from e
 
         if current_credentials and current_credentials.valid:
             try:
-                service = build(api_name, api_version, credentials=current_credentials)
-                log_func(f"Service '{api_name} v{api_version}' built successfully with current credentials.")
-                return service
+                return _build_cached_service(api_name, api_version, current_credentials, log_func)
             except Exception as e:
                 log_func(f"Error building API service: {e}")
-                if threading.current_thread() is threading.main_thread():
-                    messagebox.showerror("Service Build Error", f"Could not build API service: {e}")
-                else:
-                    print(f"CRITICAL ERROR (non-UI thread): Could not build API service: {e}")
-                return None
+                raise AuthenticationError(f"Could not build API service: {e}") from e
         else:
             log_func("Failed to obtain valid credentials after all attempts.")
-            if threading.current_thread() is threading.main_thread():
-                messagebox.showerror("Authentication Failed", "Could not obtain valid credentials.")
-            else:
-                print("CRITICAL ERROR (non-UI thread): Could not obtain valid credentials.")
-            return None
\ No newline at end of file
+            raise AuthenticationError("Could not obtain valid credentials.")
\ No newline at end of file
@@ -15,12 +15,74 @@ ALL_APP_SCOPES = list(set(UPLOAD_SCOPES + READONLY_SCOPES + COMMENT_SCOPES))
 API_SERVICE_NAME = 'youtube'
 API_VERSION = 'v3'
 
+# Retry policy shared by all API calls: capped exponential backoff with full jitter
+API_RETRY_MAX_ATTEMPTS = 6
+API_RETRY_BASE_DELAY_SECONDS = 1.0
+API_RETRY_MAX_DELAY_SECONDS = 60.0
+API_RETRY_DEADLINE_SECONDS = 300.0 # Per call (or per upload chunk), including backoff
+
+# videos.list accepts up to 50 IDs per call; batches run concurrently up to this limit
+VIDEOS_LIST_MAX_IDS = 50
+STATS_MAX_CONCURRENT_REQUESTS = 4
+
+# In-memory cache for read-only endpoints (videos.list). Entries younger than the TTL are
+# served without a request; older ones are revalidated with If-None-Match.
+RESPONSE_CACHE_TTL_SECONDS = 120
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Trending: the mostPopular chart returns at most 200 videos per region, 50 per page
+TRENDING_MAX_RESULTS_PER_REGION = 200
+TRENDING_PAGE_SIZE = 50
+TRENDING_MAX_CONCURRENT_REGIONS = 4
+
+# Local discovery document store used to build API clients without a network round-trip
+DISCOVERY_CACHE_DIR = 'discovery_cache'
+DISCOVERY_REFRESH_INTERVAL_SECONDS = 7 * 24 * 3600
+
+# --- Uploads ---
+UPLOAD_MAX_WORKERS = 3 # Videos uploaded in parallel by the upload engine
+UPLOAD_BANDWIDTH_LIMIT_BYTES_PER_SEC = 0 # Shared by all uploads. 0 = unlimited
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024 # Starting chunk size. Must be a multiple of 256 KiB
+# The chunk size then adapts so that one chunk takes about UPLOAD_CHUNK_TARGET_SECONDS
+UPLOAD_CHUNK_SIZE_MIN = 1024 * 1024
+UPLOAD_CHUNK_SIZE_MAX = 128 * 1024 * 1024
+UPLOAD_CHUNK_TARGET_SECONDS = 10
+# Scheduled posts are uploaded early (private + publishAt) so they are ready at their slot.
+# Lead time = file size / measured throughput * safety factor, clamped to [min, max].
+UPLOAD_LEAD_TIME_MIN_SECONDS = 10 * 60
+UPLOAD_LEAD_TIME_MAX_SECONDS = 12 * 3600
+UPLOAD_LEAD_TIME_SAFETY_FACTOR = 2.0
+UPLOAD_DEFAULT_THROUGHPUT_BYTES_PER_SEC = 1024 * 1024 # Used until an upload has been measured
+# The scheduler sleeps until the next post is due; these bound how long it waits.
+SCHEDULER_MAX_SLEEP_SECONDS = 300 # Safety re-check, e.g. after the system clock jumps
+SCHEDULER_RETRY_DELAY_SECONDS = 60 # Due posts that could not be queued (auth failure) are retried after this
+
+# --- UI ---
+SCHEDULE_LIST_PAGE_SIZE = 200 # Rows materialised at once in the scheduled-posts list
+STATUS_EVENTS_SAFETY_POLL_MS = 5000 # Fallback drain of the status event queue; normally woken per event burst
+STATUS_BAR_MAX_UPDATES_PER_SEC = 4 # Log messages in between are written to the log file only
+
 # --- File Paths ---
 SCHEDULED_POSTS_FILE = 'scheduled_posts.json'
 COMMENT_TEMPLATES_FILE = 'comment_templates.json'
+# Schedule store: 'json' (snapshot + journal) or 'sqlite' (indexed, row-level updates).
+# Switching to 'sqlite' migrates the existing JSON schedule once.
+SCHEDULE_STORE_BACKEND = 'json'
+SCHEDULE_DB_FILE = 'scheduled_posts.db'
+SCHEDULED_POSTS_JOURNAL_FILE = 'scheduled_posts.journal' # Append-only post mutations since the last snapshot
+SCHEDULE_JOURNAL_COMPACT_THRESHOLD = 500 # Journal entries before it is folded into the snapshot
+JSON_BACKUP_GENERATIONS = 3 # file.json.bak1 (newest) .. bakN, used when the main file is unreadable
+UPLOAD_SESSIONS_FILE = 'upload_sessions.json' # Resumable upload sessions, keyed by file fingerprint
+UPLOAD_SESSION_MAX_AGE_SECONDS = 6 * 24 * 3600 # YouTube keeps resumable sessions for about a week
+LOG_FILE = 'youtube_tool.log' # Rotated to youtube_tool.log.1 .. .N
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_LEVEL = 'INFO' # 'DEBUG' also logs every upload progress step
 
 # --- Timezone ---
 VIETNAM_TZ_STR = 'Asia/Ho_Chi_Minh'
+VIETNAM_UTC_OFFSET_HOURS = 7 # Fallback when the zone database (tzdata) is unavailable
 
 # --- Comment Generation ---
 MEANINGFUL_COMMENT_BASES = [
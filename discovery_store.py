@@ -0,0 +1,125 @@
+# discovery_store.py
+import os
+import json
+import time
+import threading
+
+import httplib2
+import googleapiclient
+
+from config import DISCOVERY_CACHE_DIR, DISCOVERY_REFRESH_INTERVAL_SECONDS
+
+DISCOVERY_URL_TEMPLATE = "https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest"
+
+_refresh_lock = threading.Lock()
+_refreshing = set()
+
+def _document_path(api_name, api_version):
+    return os.path.join(DISCOVERY_CACHE_DIR, f"{api_name}.{api_version}.json")
+
+def _stamp_path(api_name, api_version):
+    return os.path.join(DISCOVERY_CACHE_DIR, f"{api_name}.{api_version}.stamp.json")
+
+def _write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def _store_document(api_name, api_version, content, source, log_func=print):
+    try:
+        revision = json.loads(content).get('revision')
+    except (ValueError, AttributeError) as e:
+        log_func(f"Discovery: Refusing to store invalid document for '{api_name} {api_version}' ({source}): {e}")
+        return False
+    stamp = {
+        'revision': revision,
+        'library_version': googleapiclient.__version__,
+        'fetched_at': time.time(),
+        'source': source,
+    }
+    try:
+        _write_file(_document_path(api_name, api_version), content)
+        _write_file(_stamp_path(api_name, api_version), json.dumps(stamp))
+        log_func(f"Discovery: Stored '{api_name} {api_version}' document (revision {revision}, {source}).")
+        return True
+    except OSError as e:
+        log_func(f"Discovery: Could not store document for '{api_name} {api_version}': {e}")
+        return False
+
+def _read_local(api_name, api_version):
+    try:
+        with open(_document_path(api_name, api_version), 'r', encoding='utf-8') as f:
+            content = f.read()
+        with open(_stamp_path(api_name, api_version), 'r', encoding='utf-8') as f:
+            stamp = json.load(f)
+        if json.loads(content).get('revision') != stamp.get('revision'):
+            return None, None
+        return content, stamp
+    except (OSError, ValueError, AttributeError):
+        return None, None
+
+def _is_stale(stamp):
+    if stamp.get('library_version') != googleapiclient.__version__:
+        return True
+    return time.time() - stamp.get('fetched_at', 0) > DISCOVERY_REFRESH_INTERVAL_SECONDS
+
+def _bundled_document(api_name, api_version):
+    # google-api-python-client >= 2.0 ships static discovery documents.
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+    except ImportError:
+        return None
+    try:
+        return get_static_doc(api_name, api_version)
+    except Exception:
+        return None
+
+def _fetch_remote(api_name, api_version, log_func=print):
+    url = DISCOVERY_URL_TEMPLATE.format(api=api_name, version=api_version)
+    try:
+        resp, content = httplib2.Http(timeout=30).request(url, 'GET')
+    except Exception as e:
+        log_func(f"Discovery: Could not fetch '{url}': {e}")
+        return None
+    if resp.status != 200:
+        log_func(f"Discovery: Fetching '{url}' returned HTTP {resp.status}.")
+        return None
+    return content.decode('utf-8')
+
+def _refresh_task(api_name, api_version, log_func):
+    try:
+        content = _fetch_remote(api_name, api_version, log_func)
+        if content:
+            _store_document(api_name, api_version, content, 'remote', log_func)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard((api_name, api_version))
+
+def refresh_in_background(api_name, api_version, log_func=print):
+    key = (api_name, api_version)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    threading.Thread(target=_refresh_task, args=(api_name, api_version, log_func), daemon=True).start()
+
+def load_discovery_document(api_name, api_version, log_func=print):
+    content, stamp = _read_local(api_name, api_version)
+    if content:
+        if _is_stale(stamp):
+            log_func(f"Discovery: Local '{api_name} {api_version}' document is stale. Refreshing in background.")
+            refresh_in_background(api_name, api_version, log_func)
+        return content
+
+    # First run: seed from the copy bundled with the client library, else fetch once.
+    content = _bundled_document(api_name, api_version)
+    if content:
+        _store_document(api_name, api_version, content, 'bundled', log_func)
+        refresh_in_background(api_name, api_version, log_func)
+        return content
+    content = _fetch_remote(api_name, api_version, log_func)
+    if content:
+        _store_document(api_name, api_version, content, 'remote', log_func)
+    return content
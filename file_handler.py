@@ -1,62 +1,324 @@
 # file_handler.py
 import os
 import json
-from tkinter import messagebox
-from config import SCHEDULED_POSTS_FILE, COMMENT_TEMPLATES_FILE
+import uuid
+import shutil
+import tempfile
+import threading
+import schedule_db
+from config import (SCHEDULED_POSTS_FILE, COMMENT_TEMPLATES_FILE, JSON_BACKUP_GENERATIONS,
+                    SCHEDULED_POSTS_JOURNAL_FILE, SCHEDULE_JOURNAL_COMPACT_THRESHOLD,
+                    SCHEDULE_STORE_BACKEND, SCHEDULE_DB_FILE)
+
+# Raised when stored data exists but cannot be read; callers decide how to tell the user.
+class StorageError(Exception):
+    pass
+
+# Serialises journal appends and snapshot compaction.
+_journal_lock = threading.Lock()
+_journal_entry_count = 0
+
+def _backup_path(filepath, generation):
+    return f"{filepath}.bak{generation}"
+
+def _rotate_backups(filepath):
+    if JSON_BACKUP_GENERATIONS <= 0 or not os.path.exists(filepath):
+        return
+    for generation in range(JSON_BACKUP_GENERATIONS - 1, 0, -1):
+        older = _backup_path(filepath, generation)
+        if os.path.exists(older):
+            os.replace(older, _backup_path(filepath, generation + 1))
+    shutil.copy2(filepath, _backup_path(filepath, 1))
+
+def _fsync_directory(directory):
+    if not hasattr(os, 'O_DIRECTORY'): # Not available (or needed) on Windows
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_json_atomic(data, filepath, indent=4, keep_backups=True):
+    # Write to a temp file in the same directory, fsync, then os.replace: readers see either
+    # the old file or the new one, never a truncated mix.
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(filepath)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        if keep_backups:
+            _rotate_backups(filepath)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+def _read_json_file(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if not content.strip():
+        return None
+    return json.loads(content)
+
+def _load_from_backups(filepath, log_func=print, data_description="data"):
+    for generation in range(1, JSON_BACKUP_GENERATIONS + 1):
+        backup = _backup_path(filepath, generation)
+        if not os.path.exists(backup):
+            continue
+        try:
+            data = _read_json_file(backup)
+        except (ValueError, IOError) as e:
+            log_func(f"Backup '{backup}' is unreadable too: {e}")
+            continue
+        if data is not None:
+            log_func(f"Recovered {len(data)} {data_description} from backup '{backup}'.")
+            return data
+    return None
 
 def get_json_data(filepath, log_func=print, data_description="data"):
     if not os.path.exists(filepath):
+        recovered = _load_from_backups(filepath, log_func, data_description)
+        if recovered is not None:
+            return recovered
         log_func(f"{data_description.capitalize()} file '{filepath}' not found. Creating empty.")
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+            write_json_atomic([], filepath, keep_backups=False)
             return []
         except IOError as e:
             log_func(f"Error creating empty {data_description} file '{filepath}': {e}")
-            messagebox.showerror("File Error", f"Could not create {data_description} file:\n{e}")
             return []
 
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        if not content.strip():
-            return []
-        data = json.loads(content)
+        data = _read_json_file(filepath)
+        if data is None:
+            # An empty file can only come from an interrupted legacy write; prefer a backup if any.
+            recovered = _load_from_backups(filepath, log_func, data_description)
+            return recovered if recovered is not None else []
         log_func(f"Loaded {len(data)} {data_description} from '{filepath}'.")
         return data
     except json.JSONDecodeError:
-        log_func(f"ERROR reading JSON file: '{filepath}'. Corrupted?")
-        messagebox.showerror("JSON Error", f"Error reading {data_description} file:\n'{filepath}'\nFile seems corrupted. Please check or delete.")
-        return []
+        log_func(f"ERROR reading JSON file: '{filepath}'. Corrupted? Trying backups.")
+        recovered = _load_from_backups(filepath, log_func, data_description)
+        if recovered is not None:
+            log_func(f"WARNING: The {data_description} file '{filepath}' was corrupted. Recovered {len(recovered)} entries from the latest good backup.")
+            return recovered
+        raise StorageError(f"Error reading {data_description} file:\n'{filepath}'\nFile seems corrupted and no usable backup was found. Please check or delete.")
     except IOError as e:
          log_func(f"ERROR reading file '{filepath}': {e}")
-         messagebox.showerror("File Error", f"Could not read {data_description} file:\n{e}")
-         return []
+         raise StorageError(f"Could not read {data_description} file:\n{e}") from e
+    except StorageError:
+        raise
     except Exception as e:
         log_func(f"Unknown error reading JSON file '{filepath}': {e}")
-        messagebox.showerror("Error", f"Unexpected error reading {data_description} file:\n{e}")
-        return []
+        raise StorageError(f"Unexpected error reading {data_description} file:\n{e}") from e
 
 def save_json_data(data, filepath, log_func=print, data_description="data"):
+    # Returns False (after logging) if the data could not be written.
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        write_json_atomic(data, filepath)
         log_func(f"Saved {len(data)} {data_description} to '{filepath}'.")
+        return True
     except IOError as e:
         log_func(f"Error saving {data_description} file '{filepath}': {e}")
-        messagebox.showerror("File Error", f"Could not save {data_description} file:\n{e}")
     except Exception as e:
         log_func(f"Unknown error saving JSON file '{filepath}': {e}")
-        messagebox.showerror("Error", f"Unexpected error saving {data_description} file:\n{e}")
+    return False
+
+def new_post_id():
+    return uuid.uuid4().hex
+
+def ensure_post_ids(posts):
+    assigned = 0
+    for post in posts:
+        if not post.get('id'):
+            post['id'] = new_post_id()
+            assigned += 1
+    return assigned
+
+def _apply_journal_entry(posts, entry):
+    # Replay must be idempotent: a crash between snapshot and journal truncation replays
+    # entries the snapshot already contains.
+    op = entry.get('op')
+    if op == 'create':
+        post = entry['post']
+        for i, existing in enumerate(posts):
+            if existing.get('id') == post.get('id'):
+                posts[i] = post
+                return
+        posts.append(post)
+    elif op == 'update':
+        for existing in posts:
+            if existing.get('id') == entry.get('id'):
+                existing.update(entry.get('fields', {}))
+                return
+    elif op == 'delete':
+        posts[:] = [p for p in posts if p.get('id') != entry.get('id')]
+
+def _replay_journal(posts, log_func=print):
+    # Returns (entries replayed, non-empty lines seen); unreadable lines are counted but skipped.
+    if not os.path.exists(SCHEDULED_POSTS_JOURNAL_FILE):
+        return 0, 0
+    replayed = 0
+    lines_seen = 0
+    try:
+        with open(SCHEDULED_POSTS_JOURNAL_FILE, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                lines_seen += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Only the last line can be torn by a crash mid-append.
+                    log_func(f"Ignoring unreadable journal entry at line {line_no} of '{SCHEDULED_POSTS_JOURNAL_FILE}'.")
+                    continue
+                _apply_journal_entry(posts, entry)
+                replayed += 1
+    except IOError as e:
+        log_func(f"ERROR reading journal '{SCHEDULED_POSTS_JOURNAL_FILE}': {e}")
+    return replayed, lines_seen
+
+def _trim_torn_journal_tail(log_func=print):
+    # Cuts an unterminated last line, so the next append starts on a line of its own
+    # instead of being glued onto the fragment.
+    try:
+        with open(SCHEDULED_POSTS_JOURNAL_FILE, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                log_func(f"Removed a torn last entry from journal '{SCHEDULED_POSTS_JOURNAL_FILE}'.")
+    except IOError as e:
+        log_func(f"Error trimming journal '{SCHEDULED_POSTS_JOURNAL_FILE}': {e}")
+
+def _use_sqlite():
+    return SCHEDULE_STORE_BACKEND == 'sqlite'
+
+def _get_scheduled_posts_sqlite(log_func=print):
+    if not schedule_db.get_meta('migrated_from_json'):
+        # One-shot migration; the JSON file is left in place as a backup.
+        posts = _get_scheduled_posts_json(log_func) if os.path.exists(SCHEDULED_POSTS_FILE) else []
+        if schedule_db.count_posts() == 0:
+            schedule_db.replace_all(posts)
+            log_func(f"Migrated {len(posts)} scheduled posts from '{SCHEDULED_POSTS_FILE}' to '{SCHEDULE_DB_FILE}'.")
+        schedule_db.set_meta('migrated_from_json', SCHEDULED_POSTS_FILE)
+    posts = schedule_db.load_posts()
+    if ensure_post_ids(posts):
+        schedule_db.replace_all(posts)
+    log_func(f"Loaded {len(posts)} scheduled posts from '{SCHEDULE_DB_FILE}'.")
+    return posts
 
 def get_scheduled_posts(log_func=print):
-    return get_json_data(SCHEDULED_POSTS_FILE, log_func, "scheduled posts")
+    if _use_sqlite():
+        try:
+            return _get_scheduled_posts_sqlite(log_func)
+        except Exception as e:
+            log_func(f"ERROR reading schedule database '{SCHEDULE_DB_FILE}': {e}")
+            raise StorageError(f"Could not read the schedule database:\n{e}") from e
+    return _get_scheduled_posts_json(log_func)
+
+def get_due_post_ids(statuses, until_utc_iso, log_func=print):
+    # Indexed lookup with the SQLite store; None means "no index, scan the list".
+    if not _use_sqlite():
+        return None
+    try:
+        return schedule_db.due_post_ids(statuses, until_utc_iso)
+    except Exception as e:
+        log_func(f"ERROR querying due posts from '{SCHEDULE_DB_FILE}': {e}")
+        return None
+
+def _get_scheduled_posts_json(log_func=print):
+    global _journal_entry_count
+    posts = get_json_data(SCHEDULED_POSTS_FILE, log_func, "scheduled posts")
+    ids_assigned = ensure_post_ids(posts)
+    with _journal_lock:
+        replayed, lines_seen = _replay_journal(posts, log_func)
+        if replayed:
+            log_func(f"Replayed {replayed} journal entries onto the scheduled posts snapshot.")
+        # Compact whenever the journal had any line, readable or not, so a torn entry never stays behind.
+        if lines_seen or ids_assigned:
+            if not _compact_locked(posts, log_func) and lines_seen:
+                _journal_entry_count = replayed
+                _trim_torn_journal_tail(log_func)
+    return posts
+
+def _compact_locked(posts, log_func=print):
+    # Returns False if the snapshot could not be written; the journal is then kept, since
+    # it still holds the only durable copy of the changes since the last snapshot.
+    global _journal_entry_count
+    if not save_json_data(posts, SCHEDULED_POSTS_FILE, log_func, "scheduled posts"):
+        log_func(f"Keeping journal '{SCHEDULED_POSTS_JOURNAL_FILE}' because the snapshot write failed.")
+        return False
+    try:
+        with open(SCHEDULED_POSTS_JOURNAL_FILE, 'w', encoding='utf-8'):
+            pass
+        _journal_entry_count = 0
+    except IOError as e:
+        log_func(f"Error truncating journal '{SCHEDULED_POSTS_JOURNAL_FILE}': {e}")
+    return True
 
 def save_scheduled_posts(posts, log_func=print):
-    save_json_data(posts, SCHEDULED_POSTS_FILE, log_func, "scheduled posts")
+    # Full snapshot; also folds the journal in.
+    if _use_sqlite():
+        return _write_sqlite(schedule_db.replace_all, posts, log_func)
+    with _journal_lock:
+        return _compact_locked(posts, log_func)
+
+def _write_sqlite(operation, arg, log_func=print):
+    try:
+        operation(arg)
+        return True
+    except Exception as e:
+        log_func(f"Error writing schedule database '{SCHEDULE_DB_FILE}': {e}")
+        return False
+
+def _append_journal_entry(posts, entry, log_func=print):
+    global _journal_entry_count
+    with _journal_lock:
+        try:
+            with open(SCHEDULED_POSTS_JOURNAL_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            _journal_entry_count += 1
+        except IOError as e:
+            log_func(f"Error appending to journal '{SCHEDULED_POSTS_JOURNAL_FILE}': {e}. Writing full snapshot instead.")
+            if not _compact_locked(posts, log_func):
+                log_func("ERROR: Schedule change could not be saved; it is only kept in memory until the next successful save.")
+            return
+        if _journal_entry_count >= SCHEDULE_JOURNAL_COMPACT_THRESHOLD:
+            log_func(f"Compacting schedule journal ({_journal_entry_count} entries).")
+            _compact_locked(posts, log_func)
+
+# With the SQLite store these become row-level writes instead of journal appends.
+def journal_post_created(posts, post, log_func=print):
+    if not post.get('id'):
+        post['id'] = new_post_id()
+    if _use_sqlite():
+        _write_sqlite(schedule_db.insert_post, post, log_func)
+        return
+    _append_journal_entry(posts, {'op': 'create', 'post': post}, log_func)
+
+def journal_post_updated(posts, post, fields, log_func=print):
+    if _use_sqlite():
+        _write_sqlite(schedule_db.update_post, post, log_func)
+        return
+    _append_journal_entry(posts, {'op': 'update', 'id': post['id'], 'fields': fields}, log_func)
+
+def journal_post_deleted(posts, post_id, log_func=print):
+    if _use_sqlite():
+        _write_sqlite(schedule_db.delete_post, post_id, log_func)
+        return
+    _append_journal_entry(posts, {'op': 'delete', 'id': post_id}, log_func)
 
 def load_comment_templates(log_func=print):
     return get_json_data(COMMENT_TEMPLATES_FILE, log_func, "comment templates")
 
 def save_comment_templates(templates, log_func=print):
-    save_json_data(templates, COMMENT_TEMPLATES_FILE, log_func, "comment templates")
\ No newline at end of file
+    return save_json_data(templates, COMMENT_TEMPLATES_FILE, log_func, "comment templates")
@@ -0,0 +1,74 @@
+# headless_scheduler.py
+# Runs the scheduler and upload engine without Tk: python -m headless_scheduler [--log-file PATH]
+# Needs a valid token.pickle; create it once by signing in through the GUI.
+import argparse
+import signal
+import sys
+import threading
+
+import config
+from time_utils import initialize_timezone
+from file_handler import get_scheduled_posts, StorageError
+from schedule_repository import ScheduleRepository
+from scheduler import set_scheduler_refs, run_scheduler_loop, wake_scheduler
+from upload_engine import UploadEngine
+from api_retry import format_retry_stats
+from notifier import set_notifier
+from log_pipeline import LogPipeline, set_level
+from auth import set_interactive_auth
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the YouTube post scheduler without the GUI.")
+    parser.add_argument('--log-file', help="Append log lines to this rotating file instead of stdout.")
+    parser.add_argument('--log-level', default=config.LOG_LEVEL, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="DEBUG also logs every upload progress step.")
+    parser.add_argument('--max-workers', type=int, default=config.UPLOAD_MAX_WORKERS, help="Concurrent uploads.")
+    parser.add_argument('--bandwidth-limit', type=int, default=config.UPLOAD_BANDWIDTH_LIMIT_BYTES_PER_SEC,
+                        help="Total upload cap in bytes/sec (0 = unlimited).")
+    args = parser.parse_args(argv)
+
+    set_level(args.log_level)
+    log = LogPipeline(args.log_file, config.LOG_MAX_BYTES, config.LOG_BACKUP_COUNT, echo=not args.log_file)
+    log.start()
+    set_notifier(lambda level, title, message: log(f"{level.upper()}: {title}: {message}"))
+    set_interactive_auth(False) # Never start a browser OAuth flow without a user at the screen
+    shutdown_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        # Only flag the shutdown here; the main thread does the logging and cleanup.
+        shutdown_event.set()
+        wake_scheduler()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handle_signal)
+
+    initialize_timezone(log)
+    try:
+        posts = get_scheduled_posts(log)
+    except StorageError as e:
+        # Unlike the GUI, do not carry on with an empty schedule nobody is watching.
+        log(f"Headless: Cannot load scheduled posts: {e}")
+        log.stop()
+        return 1
+    schedule_repo = ScheduleRepository(posts, log)
+    log(f"Headless: Loaded {len(schedule_repo)} scheduled posts.")
+    upload_engine = UploadEngine(args.max_workers, args.bandwidth_limit, log)
+    set_scheduler_refs(schedule_repo, log, shutdown_event, upload_engine)
+
+    scheduler_thread = threading.Thread(target=run_scheduler_loop, name="scheduler")
+    scheduler_thread.start()
+    log(f"Headless: Scheduler running with {upload_engine.max_workers} upload worker(s). Send SIGTERM or Ctrl+C to stop.")
+    # Short joins keep the main thread free to receive signals.
+    while scheduler_thread.is_alive():
+        scheduler_thread.join(timeout=1.0)
+
+    log("Headless: Shutting down, cancelling active uploads (they resume on the next start)...")
+    upload_engine.shutdown(cancel=True, wait=True)
+    log(f"API retry summary: {format_retry_stats()}")
+    log("Headless: Stopped.")
+    log.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# log_pipeline.py
+# Non-blocking log sink usable anywhere a log_func is expected. Callers only put a tuple on a
+# SimpleQueue; one writer thread formats the lines, echoes them to the console, appends them to a
+# rotating log file and hands the latest message to a status sink at a throttled rate.
+import datetime
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+
+_level = INFO
+
+def set_level(level):
+    # Accepts a level number or name ('DEBUG', 'INFO', ...). Applies to every log_func.
+    global _level
+    _level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+
+def is_enabled(level):
+    return level >= _level
+
+def log_verbose(log_func, build_message):
+    # Per-chunk / per-tick detail. build_message() is only called when DEBUG is enabled,
+    # so at the default INFO level a dropped message costs a single comparison.
+    if DEBUG >= _level:
+        log_func(build_message())
+
+_STOP = object()
+
+class LogPipeline:
+    def __init__(self, log_file=None, max_bytes=5 * 1024 * 1024, backup_count=3, echo=True):
+        self._queue = queue.SimpleQueue()
+        self._echo = echo
+        self._file_handler = None
+        if log_file:
+            try:
+                self._file_handler = logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+                self._file_handler.setFormatter(logging.Formatter('%(message)s'))
+            except OSError as e:
+                print(f"LogPipeline: Cannot open log file '{log_file}': {e}. Logging to console only.")
+        self._status_sink = None
+        self._status_interval = 0.0
+        self._thread = None
+
+    def __call__(self, message, level=INFO):
+        # Safe from any thread, never blocks on I/O or the Tk loop.
+        if level >= _level:
+            self._queue.put((time.time(), level, message))
+
+    def set_status_sink(self, sink, max_updates_per_sec=4):
+        # sink(message) runs on the writer thread with the newest INFO+ message, at most
+        # max_updates_per_sec times a second; messages in between are only written to the log.
+        self._status_interval = 1.0 / max_updates_per_sec if max_updates_per_sec else 0.0
+        self._status_sink = sink
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        # Flushes everything queued so far, then closes the log file.
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+        if self._file_handler:
+            self._file_handler.close()
+
+    def _run(self):
+        pending_status = None
+        last_status_at = 0.0
+        stopping = False
+        while not stopping:
+            try:
+                # Wake up at least once per status interval so a held-back message still gets shown.
+                item = self._queue.get(timeout=self._status_interval or None) if pending_status is not None else self._queue.get()
+            except queue.Empty:
+                item = None
+            batch = []
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if batch:
+                self._write_batch(batch)
+                status_items = [entry for entry in batch if entry[1] >= INFO]
+                if status_items and self._status_sink:
+                    pending_status = status_items[-1][2]
+            now = time.monotonic()
+            if pending_status is not None and (stopping or now - last_status_at >= self._status_interval):
+                try:
+                    self._status_sink(pending_status)
+                except Exception as e:
+                    print(f"LogPipeline: Status sink error: {e}")
+                pending_status = None
+                last_status_at = now
+
+    def _write_batch(self, batch):
+        lines = []
+        for created, level, message in batch:
+            timestamp = datetime.datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+            prefix = f"[{timestamp}]" if level == INFO else f"[{timestamp}] {logging.getLevelName(level)}:"
+            lines.append(f"{prefix} {message}")
+        if self._echo:
+            try:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+            except (OSError, ValueError, AttributeError):
+                pass # No usable console (pythonw, closed stdout)
+        if self._file_handler:
+            for (created, level, _), line in zip(batch, lines):
+                record = logging.LogRecord('youtube_tool', level, __file__, 0, line, None, None)
+                record.created = created
+                self._file_handler.handle(record)
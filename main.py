@@ -1,25 +1,32 @@
 # main_app.py
+import time
+PROCESS_STARTED = time.perf_counter() # Taken before the heavier imports below, for the startup time log
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ttkthemes import ThemedTk
 import threading
-import queue
-import datetime
 import os
 
 import config
 from time_utils import initialize_timezone
-from file_handler import get_scheduled_posts, load_comment_templates
-from scheduler import set_scheduler_refs, run_scheduler_loop
+from file_handler import get_scheduled_posts, load_comment_templates, StorageError
+from schedule_repository import ScheduleRepository
+from scheduler import set_scheduler_refs, run_scheduler_loop, wake_scheduler
+from upload_engine import UploadEngine
+from api_retry import format_retry_stats
+from notifier import set_notifier
+from status_events import StatusEventQueue, UPDATE_UI, POST_CHANGED, PROGRESS, LOG
+from log_pipeline import LogPipeline, set_level, INFO
 from ui_components import StatusBar
 
 from tabs.uploader_tab import create_uploader_tab
 from tabs.trending_tab import create_trending_tab
 from tabs.comments_tab import create_comments_tab
-from tabs.analytics_tab import create_analytics_tab
+from tabs.analytics_tab import create_analytics_tab, warm_up_plotting
 
-status_queue = queue.Queue()
-scheduled_posts_data = []
+status_queue = StatusEventQueue()
+schedule_repo = None
 comment_templates_list = []
 
 class YouTubeToolApp:
@@ -32,43 +39,60 @@ class YouTubeToolApp:
         self.analytics_tab_ref = None
         self.comments_tab_ref = None
         self.scheduler_thread_instance = None
+        self.upload_engine = None
+        self.log_pipeline = None
 
         self._setup_logging()
+        set_notifier(self._show_notification)
         if not initialize_timezone(self.log_status):
             messagebox.showerror("Critical Error", "Timezone initialization failed. Application cannot start.")
+            self.log_pipeline.stop()
             self.root.destroy()
             return
 
         self._load_initial_data()
+        schedule_repo.add_listener(self._on_schedule_changed)
+        self.upload_engine = UploadEngine(config.UPLOAD_MAX_WORKERS, config.UPLOAD_BANDWIDTH_LIMIT_BYTES_PER_SEC, self.log_status)
         self._setup_ui()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self._start_background_tasks()
         self.log_status("Application started. Ready.")
+        self.root.after_idle(self._on_window_ready)
+
+    def _on_window_ready(self):
+        self.log_status(f"Startup: window ready {time.perf_counter() - PROCESS_STARTED:.2f}s after launch.")
+        warm_up_plotting(self.log_status)
 
     def _setup_logging(self):
-        pass
-
-    def log_status(self, message):
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] {message}"
-        print(log_message)
-
-        if hasattr(self, 'root') and self.root and \
-           hasattr(self, 'status_bar') and self.status_bar and \
-           self.root.winfo_exists() and self.status_bar.winfo_exists():
-            try:
-                self.root.after(0, self.status_bar.set_text, message)
-            except tk.TclError as e:
-                if "application has been destroyed" not in str(e).lower():
-                    print(f"Error updating status bar from log_status (TclError): {e}")
-            except Exception as e:
-                print(f"Generic error updating status bar from log_status: {e}")
+        set_level(config.LOG_LEVEL)
+        self.log_pipeline = LogPipeline(config.LOG_FILE, config.LOG_MAX_BYTES, config.LOG_BACKUP_COUNT)
+        # The writer thread forwards at most N messages a second to the status bar, via the status queue.
+        self.log_pipeline.set_status_sink(lambda message: status_queue.post(LOG, message),
+                                          config.STATUS_BAR_MAX_UPDATES_PER_SEC)
+        self.log_pipeline.start()
+
+    def log_status(self, message, level=INFO):
+        # Only enqueues; formatting, console/file output and the status bar happen on the writer thread.
+        self.log_pipeline(message, level)
 
     def _load_initial_data(self):
-        global scheduled_posts_data, comment_templates_list
-        scheduled_posts_data = get_scheduled_posts(self.log_status)
-        comment_templates_list = load_comment_templates(self.log_status)
-        self.log_status(f"Initial data loaded: {len(scheduled_posts_data)} scheduled, {len(comment_templates_list)} templates.")
+        global schedule_repo, comment_templates_list
+        read_only = False
+        try:
+            posts = get_scheduled_posts(self.log_status)
+        except StorageError as e:
+            # Carrying on with an empty writable schedule would later compact it over the unreadable file.
+            messagebox.showerror("Scheduled Posts Error", f"{e}\n\nScheduling is disabled for this session. "
+                                 f"Repair '{config.SCHEDULED_POSTS_FILE}' or restore a .bak copy, then restart.")
+            posts = []
+            read_only = True
+        schedule_repo = ScheduleRepository(posts, self.log_status, read_only=read_only)
+        try:
+            comment_templates_list = load_comment_templates(self.log_status)
+        except StorageError as e:
+            messagebox.showerror("Comment Templates Error", str(e))
+            comment_templates_list = []
+        self.log_status(f"Initial data loaded: {len(schedule_repo)} scheduled, {len(comment_templates_list)} templates.")
 
     def _setup_ui(self):
         self.root.title("YouTube Tool Enhanced")
@@ -94,7 +118,7 @@ class YouTubeToolApp:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(pady=10, padx=10, fill="both", expand=True)
 
-        self.uploader_tab_ref = create_uploader_tab(self.notebook, self.root, scheduled_posts_data, status_queue, self.log_status, self.refresh_dependent_tabs)
+        self.uploader_tab_ref = create_uploader_tab(self.notebook, self.root, schedule_repo, status_queue, self.log_status, self.refresh_dependent_tabs, self.upload_engine)
         self.notebook.add(self.uploader_tab_ref, text=' Upload & Schedule ')
 
         trending_tab = create_trending_tab(self.notebook, self.root, self.log_status)
@@ -103,7 +127,7 @@ class YouTubeToolApp:
         self.comments_tab_ref = create_comments_tab(self.notebook, self.root, comment_templates_list, self.log_status)
         self.notebook.add(self.comments_tab_ref, text=' Comment Tools ')
 
-        self.analytics_tab_ref = create_analytics_tab(self.notebook, self.root, scheduled_posts_data, self.log_status)
+        self.analytics_tab_ref = create_analytics_tab(self.notebook, self.root, schedule_repo, self.log_status)
         self.notebook.add(self.analytics_tab_ref, text=' Analytics ')
 
     def refresh_dependent_tabs(self):
@@ -111,35 +135,85 @@ class YouTubeToolApp:
         if self.analytics_tab_ref and hasattr(self.analytics_tab_ref, 'update_list'):
             self.analytics_tab_ref.update_list()
 
-    def _check_status_queue(self):
+    def _show_notification(self, level, title, message):
+        # Called from any thread; the messagebox itself always runs on the Tk main loop.
+        show = {'error': messagebox.showerror, 'warning': messagebox.showwarning}.get(level, messagebox.showinfo)
+        self.log_status(f"{title}: {message}")
+        if not self.shutdown_event.is_set():
+            self.root.after(0, show, title, message)
+
+    def _on_schedule_changed(self, action, post_id):
+        # Runs on whichever thread changed the schedule; the drain coalesces bursts into one refresh.
+        if not self.shutdown_event.is_set():
+            status_queue.post(POST_CHANGED, (action, post_id))
+
+    def _wake_status_consumer(self):
+        # Called by status_queue from any thread, once per burst of events.
+        if not self.shutdown_event.is_set():
+            self.root.after_idle(self._drain_status_events)
+
+    def _drain_status_events(self):
         try:
-            message = status_queue.get_nowait()
-            if message == "update_ui":
-                self.log_status("MainApp: UI Update requested via queue.")
-                if self.uploader_tab_ref and hasattr(self.uploader_tab_ref, 'refresh_list'):
-                    self.uploader_tab_ref.refresh_list()
-        except queue.Empty:
-            pass
+            events = status_queue.drain()
+            refresh_needed = False
+            status_text = None
+            for event in events:
+                if event.kind in (UPDATE_UI, POST_CHANGED):
+                    refresh_needed = True
+                elif event.kind == PROGRESS:
+                    status_text = self._format_progress(event.payload)
+                elif event.kind == LOG:
+                    status_text = event.payload
+            if self.shutdown_event.is_set():
+                return
+            if refresh_needed and self.uploader_tab_ref and hasattr(self.uploader_tab_ref, 'refresh_list'):
+                self.uploader_tab_ref.refresh_list()
+            if status_text is not None and self.status_bar and self.status_bar.winfo_exists():
+                self.status_bar.set_text(status_text)
+        except tk.TclError as e:
+            if "application has been destroyed" not in str(e).lower():
+                print(f"Error in _drain_status_events (TclError): {e}")
         except Exception as e:
-            print(f"Error in _check_status_queue processing: {e}")
-        finally:
-            if hasattr(self, 'root') and self.root and self.root.winfo_exists() and not self.shutdown_event.is_set():
-                self.root.after(1500, self._check_status_queue)
+            print(f"Error in _drain_status_events processing: {e}")
 
-    def _start_background_tasks(self):
-        set_scheduler_refs(scheduled_posts_data, status_queue, self.log_status, self.shutdown_event)
-        self.scheduler_thread_instance = threading.Thread(target=run_scheduler_loop, daemon=True)
-        self.scheduler_thread_instance.start()
+    def _format_progress(self, info):
+        text = f"Uploading '{info.get('title', '')}': {int((info.get('progress') or 0) * 100)}%"
+        if info.get('mb_per_sec'):
+            text += f" ({info['mb_per_sec']:.2f} MB/s)"
+        return text
 
+    def _poll_status_events(self):
+        # Safety net only: events normally arrive through _wake_status_consumer.
+        if hasattr(self, 'root') and self.root and self.root.winfo_exists() and not self.shutdown_event.is_set():
+            self._drain_status_events()
+            self.root.after(config.STATUS_EVENTS_SAFETY_POLL_MS, self._poll_status_events)
+
+    def _start_background_tasks(self):
+        if schedule_repo.read_only:
+            self.log_status("MainApp: Scheduled posts could not be loaded; the scheduler is not started.")
+        else:
+            set_scheduler_refs(schedule_repo, self.log_status, self.shutdown_event, self.upload_engine)
+            self.scheduler_thread_instance = threading.Thread(target=run_scheduler_loop, daemon=True)
+            self.scheduler_thread_instance.start()
+
+        status_queue.set_waker(self._wake_status_consumer)
         if self.root.winfo_exists():
-            self.root.after(1500, self._check_status_queue)
+            self.root.after_idle(self._drain_status_events) # Messages logged before the waker was set
+            self.root.after(config.STATUS_EVENTS_SAFETY_POLL_MS, self._poll_status_events)
 
         self.log_status(f"App config: Timezone '{config.VIETNAM_TZ_STR}'. Client Secret: '{os.path.basename(config.CLIENT_SECRETS_FILE)}'.")
         self.log_status(f"Initial auth uses scopes: {config.ALL_APP_SCOPES}")
+        self.log_status(f"Upload engine: {self.upload_engine.max_workers} worker(s), bandwidth cap: {config.UPLOAD_BANDWIDTH_LIMIT_BYTES_PER_SEC or 'unlimited'} B/s.")
 
     def on_closing(self):
         self.log_status("Application is closing...")
         self.shutdown_event.set()
+        wake_scheduler()
+        set_notifier(None)
+
+        if self.upload_engine:
+            self.log_status("Cancelling active uploads...")
+            self.upload_engine.shutdown(cancel=True, wait=False)
 
         if self.scheduler_thread_instance and self.scheduler_thread_instance.is_alive():
             self.log_status("Waiting for scheduler thread to finish...")
@@ -147,7 +221,9 @@ class YouTubeToolApp:
             if self.scheduler_thread_instance.is_alive():
                 self.log_status("Scheduler thread did not finish in time.")
         
+        self.log_status(f"API retry summary: {format_retry_stats()}")
         self.log_status("Destroying root window.")
+        self.log_pipeline.stop()
         self.root.destroy()
 
 if __name__ == "__main__":
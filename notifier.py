@@ -0,0 +1,29 @@
+# notifier.py
+# User-facing error/warning popups go through here instead of tkinter.messagebox, so the
+# API, auth and persistence code also runs headless. The GUI installs a notifier that shows
+# messageboxes on the Tk thread; without one, notifications are only printed.
+
+_notifier = None
+
+def set_notifier(func):
+    # func(level, title, message) with level in 'error', 'warning', 'info'. None restores the default.
+    global _notifier
+    _notifier = func
+
+def notify(level, title, message):
+    if _notifier:
+        try:
+            _notifier(level, title, message)
+            return
+        except Exception as e:
+            print(f"Notifier error ({e}); falling back to print.")
+    print(f"[{level.upper()}] {title}: {message}")
+
+def notify_error(title, message):
+    notify('error', title, message)
+
+def notify_warning(title, message):
+    notify('warning', title, message)
+
+def notify_info(title, message):
+    notify('info', title, message)
@@ -0,0 +1,83 @@
+# response_cache.py
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from googleapiclient.errors import HttpError
+
+from api_retry import call_with_retry
+from config import RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES
+
+class ResponseCache:
+    # LRU of (etag, body) keyed by request URI, bounded by entry count and approximate size.
+    def __init__(self, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, etag, body):
+        size = len(json.dumps(body, ensure_ascii=False))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._total_bytes -= old['size']
+            self._entries[key] = {'etag': etag, 'body': body, 'stored_at': time.monotonic(), 'size': size}
+            self._total_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted['size']
+
+    def touch(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry['stored_at'] = time.monotonic()
+
+    def is_fresh(self, entry):
+        return time.monotonic() - entry['stored_at'] < self.ttl_seconds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+read_cache = ResponseCache()
+
+def execute_cached(request, operation, log_func=print, cache=read_cache):
+    key = f"{request.method} {request.uri}"
+    entry = cache.get(key)
+    if entry and cache.is_fresh(entry):
+        cache.hits += 1
+        log_func(f"Cache: {operation} served from cache.")
+        return entry['body']
+    if entry and entry['etag']:
+        request.headers['If-None-Match'] = entry['etag']
+    try:
+        body = call_with_retry(request.execute, operation, log_func)
+    except HttpError as e:
+        if entry and e.resp.status == 304:
+            cache.touch(key)
+            cache.revalidated += 1
+            log_func(f"Cache: {operation} not modified (304), served from cache.")
+            return entry['body']
+        raise
+    cache.misses += 1
+    cache.put(key, body.get('etag') if isinstance(body, dict) else None, body)
+    return body
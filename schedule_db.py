@@ -0,0 +1,90 @@
+# schedule_db.py
+import json
+import sqlite3
+import threading
+
+from config import SCHEDULE_DB_FILE
+
+_local = threading.local() # sqlite3 connections must stay on the thread that opened them
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    status TEXT,
+    scheduled_time TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_status_time ON posts (status, scheduled_time);
+CREATE INDEX IF NOT EXISTS idx_posts_position ON posts (position);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def _connection():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(SCHEDULE_DB_FILE, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+def _row_values(post):
+    return (post.get('status'), post.get('scheduled_time'), json.dumps(post, ensure_ascii=False), post['id'])
+
+def get_meta(key):
+    row = _connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def set_meta(key, value):
+    conn = _connection()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+def count_posts():
+    return _connection().execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+def load_posts():
+    rows = _connection().execute("SELECT data FROM posts ORDER BY position").fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+def replace_all(posts):
+    conn = _connection()
+    with conn:
+        conn.execute("DELETE FROM posts")
+        conn.executemany(
+            "INSERT INTO posts (position, status, scheduled_time, data, id) VALUES (?, ?, ?, ?, ?)",
+            [(position,) + _row_values(post) for position, post in enumerate(posts)]
+        )
+
+def insert_post(post):
+    conn = _connection()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO posts (position, status, scheduled_time, data, id) "
+            "VALUES ((SELECT COALESCE(MAX(position), -1) + 1 FROM posts), ?, ?, ?, ?)",
+            _row_values(post)
+        )
+
+def update_post(post):
+    conn = _connection()
+    with conn:
+        conn.execute("UPDATE posts SET status = ?, scheduled_time = ?, data = ? WHERE id = ?", _row_values(post))
+
+def delete_post(post_id):
+    conn = _connection()
+    with conn:
+        conn.execute("DELETE FROM posts WHERE id = ?", (post_id,))
+
+def due_post_ids(statuses, until_utc_iso):
+    # Range scan on idx_posts_status_time; scheduled_time is stored as sortable 'YYYY-MM-DDTHH:MM:SSZ'.
+    placeholders = ", ".join("?" for _ in statuses)
+    rows = _connection().execute(
+        f"SELECT id FROM posts WHERE status IN ({placeholders}) AND scheduled_time <= ? ORDER BY scheduled_time",
+        (*statuses, until_utc_iso)
+    ).fetchall()
+    return [row[0] for row in rows]
@@ -0,0 +1,185 @@
+# schedule_repository.py
+import datetime
+import threading
+
+from time_utils import convert_utc_to_vn_str
+from file_handler import StorageError, new_post_id, ensure_post_ids, journal_post_created, journal_post_updated, journal_post_deleted
+
+class ScheduleRepository:
+    # Owns the scheduled posts list plus an id -> post index, and persists every change
+    # through the file_handler journal. Posts are addressed by their stable 'id', never by position.
+    # Readers only ever get copies, so nothing outside this class can mutate a post without the
+    # change being journaled and announced. Two locks: self._lock guards the in-memory state and is
+    # only held for dict/list work, so the Tk thread never waits on disk; self._write_lock
+    # serialises writers across mutation and journal append, so entries hit disk in mutation order.
+    # read_only is for a schedule that failed to load: persisting this session's posts would
+    # compact them over the unreadable file, so every write raises StorageError instead.
+    def __init__(self, posts, log_func=print, read_only=False):
+        self.log_func = log_func
+        self.read_only = read_only
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._posts = posts
+        ensure_post_ids(self._posts)
+        self._by_id = {post['id']: post for post in self._posts}
+        self._listeners = []
+        self._time_cache = {} # post_id -> (scheduled_time string, UTC epoch, VN display string)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._posts)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def snapshot(self):
+        with self._lock:
+            return [dict(post) for post in self._posts]
+
+    def get(self, post_id):
+        with self._lock:
+            post = self._by_id.get(post_id)
+            return dict(post) if post is not None else None
+
+    def schedule_times(self, post):
+        # (utc_epoch, vn_display) for the post's scheduled_time, parsed once per distinct value.
+        # The epoch is None when the time is missing or malformed.
+        post_id = post.get('id')
+        scheduled_time = post.get('scheduled_time')
+        with self._lock:
+            cached = self._time_cache.get(post_id)
+        if cached and cached[0] == scheduled_time:
+            return cached[1], cached[2]
+        try:
+            utc_epoch = datetime.datetime.fromisoformat(scheduled_time.replace('Z', '+00:00')).timestamp()
+        except (AttributeError, ValueError):
+            utc_epoch = None
+        vn_display = convert_utc_to_vn_str(scheduled_time, log_func=self.log_func) if scheduled_time else "N/A"
+        if vn_display != "N/A" or not scheduled_time: # "N/A" for a set time means the timezone is not ready yet
+            with self._lock:
+                if post_id in self._by_id:
+                    self._time_cache[post_id] = (scheduled_time, utc_epoch, vn_display)
+        return utc_epoch, vn_display
+
+    def query(self, statuses=None, start_epoch=None, end_epoch=None, text=None, sort_by=None, descending=False):
+        # Filtered and sorted copies of the posts for list views; cheap enough to run off the Tk thread.
+        # 'error' in statuses matches every error_* status. The date range is [start_epoch, end_epoch)
+        # and excludes posts without a scheduled time. sort_by: None (schedule order), 'title', 'time', 'status'.
+        posts = self.snapshot()
+        if statuses:
+            match_errors = 'error' in statuses
+            posts = [post for post in posts if post.get('status') in statuses or
+                     (match_errors and str(post.get('status', '')).startswith('error'))]
+        if start_epoch is not None or end_epoch is not None:
+            in_range = []
+            for post in posts:
+                epoch = self.schedule_times(post)[0]
+                if epoch is None or (start_epoch is not None and epoch < start_epoch) or \
+                   (end_epoch is not None and epoch >= end_epoch):
+                    continue
+                in_range.append(post)
+            posts = in_range
+        if text:
+            needle = text.casefold()
+            posts = [post for post in posts if needle in str(post.get('title', '')).casefold()]
+        if sort_by == 'title':
+            posts.sort(key=lambda post: str(post.get('title', '')).casefold(), reverse=descending)
+        elif sort_by == 'time':
+            def time_key(post):
+                epoch = self.schedule_times(post)[0]
+                return (epoch is None, epoch or 0) # Unscheduled ("Uploaded Now") posts sort last
+            posts.sort(key=time_key, reverse=descending)
+        elif sort_by == 'status':
+            posts.sort(key=lambda post: str(post.get('status', '')), reverse=descending)
+        elif descending:
+            posts.reverse()
+        return posts
+
+    def add_listener(self, callback):
+        # callback(action, post_id) with action in 'added', 'updated', 'deleted'.
+        # Called after the lock is released, on whichever thread made the change.
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, action, post_id):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(action, post_id)
+            except Exception as e:
+                self.log_func(f"ScheduleRepository: Change listener error: {e}")
+
+    def _check_writable(self):
+        if self.read_only:
+            raise StorageError("The scheduled posts could not be loaded, so the schedule is read-only until the file is repaired.")
+
+    def add(self, post):
+        self._check_writable()
+        post = dict(post)
+        with self._write_lock:
+            with self._lock:
+                if not post.get('id'):
+                    post['id'] = new_post_id()
+                # In the list before journaling, so a compaction triggered by this append includes it.
+                self._posts.append(post)
+                self._by_id[post['id']] = post
+            journal_post_created(self._posts, post, self.log_func)
+        self._notify('added', post['id'])
+        return post['id']
+
+    def modify(self, post_id, mutate):
+        # Atomic read-modify-write: mutate(copy_of_post) returns the fields to change, or None
+        # to leave the post alone. Returns a copy of the post after the change, or None if it
+        # does not exist or was left unchanged.
+        self._check_writable()
+        with self._write_lock:
+            with self._lock:
+                post = self._by_id.get(post_id)
+                if post is None:
+                    return None
+                fields = mutate(dict(post))
+                if not fields:
+                    return None
+                post.update(fields)
+                if 'scheduled_time' in fields:
+                    self._time_cache.pop(post_id, None)
+                result = dict(post)
+            # Outside self._lock: only writers touch the live post and list, and they are all
+            # waiting on self._write_lock.
+            journal_post_updated(self._posts, post, fields, self.log_func)
+        self._notify('updated', post_id)
+        return result
+
+    def update(self, post_id, **fields):
+        return self.modify(post_id, lambda post: fields)
+
+    def compare_and_update(self, post_id, expected, **fields):
+        # Applies fields only while every key in expected still holds its value,
+        # e.g. compare_and_update(pid, {'status': 'pending'}, status='processing').
+        def mutate(post):
+            if all(post.get(key) == value for key, value in expected.items()):
+                return fields
+            return None
+        return self.modify(post_id, mutate)
+
+    def delete(self, post_id, allow=None):
+        # allow(copy_of_post) -> bool is checked under the lock, e.g. to refuse a post the
+        # scheduler claimed meanwhile. Returns the deleted post, or None if nothing was deleted.
+        self._check_writable()
+        with self._write_lock:
+            with self._lock:
+                post = self._by_id.get(post_id)
+                if post is None or (allow is not None and not allow(dict(post))):
+                    return None
+                del self._by_id[post_id]
+                self._posts.remove(post)
+                self._time_cache.pop(post_id, None)
+            journal_post_deleted(self._posts, post_id, self.log_func)
+        self._notify('deleted', post_id)
+        return post
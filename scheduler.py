@@ -1,147 +1,280 @@
 # scheduler.py
-import datetime
+import heapq
+import itertools
 import time
 import os
 import threading
 
-from file_handler import save_scheduled_posts
-from youtube_api import upload_video
+import time_utils
+from file_handler import get_due_post_ids
 from auth import get_authenticated_service
-from config import API_SERVICE_NAME, API_VERSION
-from time_utils import vietnam_tz
+from notifier import notify_error, notify_warning
+from config import (API_SERVICE_NAME, API_VERSION, UPLOAD_LEAD_TIME_MIN_SECONDS, UPLOAD_LEAD_TIME_MAX_SECONDS,
+                    UPLOAD_LEAD_TIME_SAFETY_FACTOR, UPLOAD_DEFAULT_THROUGHPUT_BYTES_PER_SEC,
+                    SCHEDULER_MAX_SLEEP_SECONDS, SCHEDULER_RETRY_DELAY_SECONDS)
 
-scheduled_posts_data_ref = []
-status_queue_ref = None
+schedule_repo_ref = None
 log_func_ref = print
 shutdown_event_ref = None
+upload_engine_ref = None
 
-def set_scheduler_refs(posts_data, queue, logger, shutdown_event):
-    global scheduled_posts_data_ref, status_queue_ref, log_func_ref, shutdown_event_ref
-    scheduled_posts_data_ref = posts_data
-    status_queue_ref = queue
+# Min-heap of (due_epoch, token, post_id). Only the scheduler thread touches the heap;
+# other threads report changed post ids through _dirty_ids and wake it with _wake_event.
+# An entry is live only while its token is still _heap_tokens[post_id].
+_due_heap = []
+_heap_tokens = {}
+_heap_seq = itertools.count()
+_dirty_ids = set()
+_dirty_lock = threading.Lock()
+_wake_event = threading.Event()
+
+def set_scheduler_refs(schedule_repo, logger, shutdown_event, upload_engine=None):
+    global schedule_repo_ref, log_func_ref, shutdown_event_ref, upload_engine_ref
+    schedule_repo_ref = schedule_repo
     log_func_ref = logger
     shutdown_event_ref = shutdown_event
+    upload_engine_ref = upload_engine
+    schedule_repo.add_listener(_on_schedule_changed)
+
+def _is_shutting_down():
+    return bool(shutdown_event_ref and shutdown_event_ref.is_set())
+
+def wake_scheduler():
+    # Interrupts the scheduler's sleep, e.g. right after shutdown_event is set.
+    _wake_event.set()
+
+def _on_schedule_changed(action, post_id):
+    with _dirty_lock:
+        _dirty_ids.add(post_id)
+    _wake_event.set()
+
+def _transition(post_id, from_status, **fields):
+    # Status changes race with the UI and upload workers, so each one only applies
+    # if the post is still in the status this thread saw.
+    return schedule_repo_ref.compare_and_update(post_id, {'status': from_status}, **fields)
+
+def estimate_upload_lead_seconds(video_path):
+    throughput = UPLOAD_DEFAULT_THROUGHPUT_BYTES_PER_SEC
+    if upload_engine_ref:
+        throughput = upload_engine_ref.estimated_throughput(default=throughput)
+    try:
+        size = os.path.getsize(video_path)
+    except (OSError, TypeError):
+        return UPLOAD_LEAD_TIME_MIN_SECONDS
+    lead = size / max(throughput, 1) * UPLOAD_LEAD_TIME_SAFETY_FACTOR
+    return min(max(lead, UPLOAD_LEAD_TIME_MIN_SECONDS), UPLOAD_LEAD_TIME_MAX_SECONDS)
+
+def recover_interrupted_posts():
+    # Uploads still marked 'processing' were cut off by a previous shutdown or crash.
+    recovered = 0
+    for post in schedule_repo_ref.snapshot():
+        if post.get('status') == 'processing' and _transition(post['id'], 'processing', status='pending'):
+            recovered += 1
+    if recovered:
+        log_func_ref(f"Scheduler: Re-queued {recovered} post(s) interrupted during upload.")
+    return recovered
+
+def _is_before_publish_time(post):
+    scheduled_epoch = schedule_repo_ref.schedule_times(post)[0]
+    return scheduled_epoch is not None and scheduled_epoch > time.time()
+
+def _on_scheduled_upload_done(job):
+    post_id = job.context
+
+    def finish(post):
+        if post.get('status') != 'processing':
+            return None
+        if job.state == 'done':
+            video_id = job.response.get('id')
+            return {'status': 'staged' if _is_before_publish_time(post) else 'uploaded', 'video_id': video_id}
+        if job.state == 'cancelled':
+            return {'status': 'pending' if _is_shutting_down() else 'cancelled'}
+        return {'status': 'error_upload'}
+
+    post = schedule_repo_ref.modify(post_id, finish)
+    if post is None:
+        log_func_ref(f"Scheduler: Upload of '{job.title}' finished ({job.state}) but its post was deleted or changed meanwhile.")
+        return
+    title = post.get('title', 'Untitled')
+    status = post.get('status')
+    if status == 'staged':
+        log_func_ref(f"Scheduler: Staged scheduled post '{title}' (ID: {post.get('video_id')}). It goes public at {post.get('scheduled_time')}.")
+    elif status == 'uploaded':
+        log_func_ref(f"Scheduler: Successfully uploaded scheduled post: '{title}' (ID: {post.get('video_id')})")
+    elif job.state == 'cancelled':
+        log_func_ref(f"Scheduler: Upload of scheduled post '{title}' cancelled. Status is now '{status}'.")
+    else:
+        log_func_ref(f"Scheduler: Upload failed for scheduled post '{title}'. Status is now 'error_upload'.")
+        notify_error("Scheduled Upload Failed", job.error or f"Could not upload scheduled post '{title}'.")
+    if job.warning:
+        notify_warning("Thumbnail Warning", job.warning)
+
+def _push_post(post, due_epoch=None):
+    # (Re)places the post in the heap; any older entry for it becomes stale.
+    status = post.get('status')
+    if status not in ('pending', 'staged'):
+        _heap_tokens.pop(post['id'], None)
+        return
+    if due_epoch is None:
+        # A missing or malformed time is due immediately, so process_due_posts marks the format error.
+        scheduled_epoch = schedule_repo_ref.schedule_times(post)[0] or 0
+        if status == 'pending' and scheduled_epoch:
+            due_epoch = scheduled_epoch - estimate_upload_lead_seconds(post.get('video_path'))
+        else:
+            due_epoch = scheduled_epoch
+    token = next(_heap_seq)
+    _heap_tokens[post['id']] = token
+    heapq.heappush(_due_heap, (due_epoch, token, post['id']))
 
-def process_scheduled_posts():
-    posts_to_process_indices = []
-    now_utc = datetime.datetime.now(datetime.timezone.utc)
-    needs_saving = False
+def _rebuild_heap():
+    _due_heap.clear()
+    _heap_tokens.clear()
+    with _dirty_lock:
+        _dirty_ids.clear()
+    # With the SQLite store the (status, scheduled_time) index yields just the schedulable rows.
+    due_ids = get_due_post_ids(('pending', 'staged'), '9999-12-31T23:59:59Z', log_func_ref)
+    if due_ids is not None:
+        posts = [post for post in (schedule_repo_ref.get(post_id) for post_id in due_ids) if post]
+    else:
+        posts = schedule_repo_ref.snapshot()
+    for post in posts:
+        _push_post(post)
+    log_func_ref(f"Scheduler: Tracking {len(_heap_tokens)} pending/staged post(s).")
 
-    for i, post in enumerate(scheduled_posts_data_ref):
-        if shutdown_event_ref and shutdown_event_ref.is_set(): break
-        if post.get('status') == 'pending':
+def _apply_changes():
+    with _dirty_lock:
+        changed = list(_dirty_ids)
+        _dirty_ids.clear()
+    for post_id in changed:
+        post = schedule_repo_ref.get(post_id)
+        if post is None:
+            _heap_tokens.pop(post_id, None)
+        else:
+            _push_post(post)
+
+def _pop_due_posts(now_epoch):
+    due = []
+    while _due_heap and _due_heap[0][0] <= now_epoch:
+        _, token, post_id = heapq.heappop(_due_heap)
+        if _heap_tokens.get(post_id) != token:
+            continue # Superseded by a newer entry, or no longer schedulable
+        del _heap_tokens[post_id]
+        post = schedule_repo_ref.get(post_id)
+        if post:
+            due.append(post)
+    return due
+
+def _seconds_until_next_due(now_epoch):
+    while _due_heap and _heap_tokens.get(_due_heap[0][2]) != _due_heap[0][1]:
+        heapq.heappop(_due_heap)
+    if not _due_heap:
+        return SCHEDULER_MAX_SLEEP_SECONDS
+    return min(max(_due_heap[0][0] - now_epoch, 0), SCHEDULER_MAX_SLEEP_SECONDS)
+
+def process_due_posts():
+    posts_to_process = []
+    now_epoch = time.time()
+    for post in _pop_due_posts(now_epoch):
+        if _is_shutting_down(): break
+        if post.get('status') == 'staged':
+            if _is_before_publish_time(post):
+                _push_post(post) # Publish time moved later meanwhile
+            elif _transition(post['id'], 'staged', status='uploaded'):
+                log_func_ref(f"Scheduler: Staged post '{post.get('title', 'Untitled')}' reached its publish time. Marked uploaded.")
+        elif post.get('status') == 'pending':
             scheduled_time_utc_str = post.get('scheduled_time')
             if not scheduled_time_utc_str:
                 log_func_ref(f"Scheduler: Skipping post '{post.get('title', 'Untitled')}' due to missing 'scheduled_time'. Marked error.")
-                scheduled_posts_data_ref[i]['status'] = 'error_format'
-                needs_saving = True
+                _transition(post['id'], 'pending', status='error_format')
                 continue
-            try:
-                scheduled_time_utc = datetime.datetime.fromisoformat(scheduled_time_utc_str.replace('Z', '+00:00'))
-                if scheduled_time_utc <= now_utc + datetime.timedelta(minutes=1):
-                     if scheduled_time_utc >= now_utc - datetime.timedelta(minutes=5):
-                         log_func_ref(f"Scheduler: Post '{post.get('title', 'Untitled')}' is due (Scheduled: {scheduled_time_utc_str}). Queuing.")
-                         posts_to_process_indices.append(i)
-                     else:
-                         log_func_ref(f"Scheduler: Post '{post.get('title', 'Untitled')}' scheduled time {scheduled_time_utc_str} is too old. Marked error.")
-                         scheduled_posts_data_ref[i]['status'] = 'error_too_old'
-                         needs_saving = True
-            except ValueError:
+            scheduled_epoch = schedule_repo_ref.schedule_times(post)[0]
+            if scheduled_epoch is None:
                 log_func_ref(f"Scheduler: Format error in 'scheduled_time' for post '{post.get('title', 'Untitled')}': '{scheduled_time_utc_str}'. Marked error.")
-                scheduled_posts_data_ref[i]['status'] = 'error_format'
-                needs_saving = True
-            except KeyError:
-                 log_func_ref(f"Scheduler: Missing 'scheduled_time' key for post index {i}. Marked error.")
-                 scheduled_posts_data_ref[i]['status'] = 'error_format'
-                 needs_saving = True
-
-    if not posts_to_process_indices or (shutdown_event_ref and shutdown_event_ref.is_set()):
-        if needs_saving:
-             save_scheduled_posts(scheduled_posts_data_ref, log_func_ref)
-             if status_queue_ref: status_queue_ref.put("update_ui")
+                _transition(post['id'], 'pending', status='error_format')
+                continue
+            if scheduled_epoch < now_epoch - 5 * 60:
+                log_func_ref(f"Scheduler: Post '{post.get('title', 'Untitled')}' scheduled time {scheduled_time_utc_str} is too old. Marked error.")
+                _transition(post['id'], 'pending', status='error_too_old')
+            else:
+                log_func_ref(f"Scheduler: Post '{post.get('title', 'Untitled')}' is due for upload (Scheduled: {scheduled_time_utc_str}). Queuing.")
+                posts_to_process.append(post)
+
+    if not posts_to_process or _is_shutting_down():
         return False
 
-    youtube = get_authenticated_service(API_SERVICE_NAME, API_VERSION, log_func_ref)
+    if not upload_engine_ref:
+        log_func_ref("Scheduler: No upload engine configured. Cannot process scheduled posts.")
+        youtube = None
+    else:
+        youtube = get_authenticated_service(API_SERVICE_NAME, API_VERSION, log_func_ref)
+        if not youtube:
+            log_func_ref("Scheduler: Authentication failed or service not available. Cannot process scheduled posts.")
     if not youtube:
-        log_func_ref("Scheduler: Authentication failed or service not available. Cannot process scheduled posts.")
-        if needs_saving:
-             save_scheduled_posts(scheduled_posts_data_ref, log_func_ref)
-             if status_queue_ref: status_queue_ref.put("update_ui")
+        retry_epoch = time.time() + SCHEDULER_RETRY_DELAY_SECONDS
+        for post in posts_to_process:
+            _push_post(post, due_epoch=retry_epoch)
         return False
 
-    processed_at_least_one = False
-    for index in posts_to_process_indices:
-        if shutdown_event_ref and shutdown_event_ref.is_set(): break
-        if index >= len(scheduled_posts_data_ref) or scheduled_posts_data_ref[index].get('status') != 'pending':
-            continue
-        post_data = scheduled_posts_data_ref[index]
+    submitted_at_least_one = False
+    for post_data in posts_to_process:
+        if _is_shutting_down(): break
+        post_id = post_data['id']
         title = post_data.get('title', 'Untitled')
         video_path = post_data.get('video_path')
         thumb_path = post_data.get('thumbnail_path')
-        description = post_data.get('description', '')
-        scheduled_time_utc_iso = post_data.get('scheduled_time')
 
-        log_func_ref(f"Scheduler: Processing scheduled post: '{title}' (Index: {index})")
+        log_func_ref(f"Scheduler: Processing scheduled post: '{title}' (ID: {post_id})")
 
-        file_error = False
         if not video_path or not os.path.exists(video_path):
             log_func_ref(f"Scheduler: Video file not found for '{title}': {video_path}. Marked error.")
-            scheduled_posts_data_ref[index]['status'] = 'error_file'
-            file_error = True
+            _transition(post_id, 'pending', status='error_file')
+            continue
         if thumb_path and not os.path.exists(thumb_path):
             log_func_ref(f"Scheduler: Thumbnail file not found for '{title}': {thumb_path}. Uploading without custom thumbnail.")
 
-        if file_error:
-            needs_saving = True
+        # Claim the post before queuing it, so the UI cannot delete or edit it into a second upload.
+        if not _transition(post_id, 'pending', status='processing'):
             continue
         try:
-            upload_response = upload_video(
-                video_path, title, description, thumb_path,
-                publish_time_utc_iso=scheduled_time_utc_iso,
-                log_func=log_func_ref
+            upload_engine_ref.submit(
+                video_path, title, post_data.get('description', ''), thumb_path,
+                publish_time_utc_iso=post_data.get('scheduled_time'),
+                context=post_id,
+                on_done=_on_scheduled_upload_done
             )
-            if upload_response and 'id' in upload_response:
-                scheduled_posts_data_ref[index]['status'] = 'uploaded'
-                scheduled_posts_data_ref[index]['video_id'] = upload_response.get('id')
-                log_func_ref(f"Scheduler: Successfully uploaded scheduled post: '{title}' (ID: {upload_response.get('id')})")
-            else:
-                 if scheduled_posts_data_ref[index]['status'] == 'pending':
-                     scheduled_posts_data_ref[index]['status'] = 'error_upload'
-                 log_func_ref(f"Scheduler: Upload failed for scheduled post '{title}'. Status is now '{scheduled_posts_data_ref[index]['status']}'.")
-            processed_at_least_one = True
-            needs_saving = True
         except Exception as e:
-            log_func_ref(f"Scheduler: Unexpected error during scheduled upload processing for '{title}': {e}")
-            scheduled_posts_data_ref[index]['status'] = 'error_unknown'
-            processed_at_least_one = True
-            needs_saving = True
-
-    if needs_saving:
-        save_scheduled_posts(scheduled_posts_data_ref, log_func_ref)
-        if status_queue_ref and not (shutdown_event_ref and shutdown_event_ref.is_set()):
-            status_queue_ref.put("update_ui")
-    return processed_at_least_one
+            log_func_ref(f"Scheduler: Could not queue upload for '{title}': {e}")
+            _transition(post_id, 'processing', status='error_unknown')
+        submitted_at_least_one = True
+    return submitted_at_least_one
 
 def run_scheduler_loop():
     log_func_ref("Scheduler thread started.")
-    while not (shutdown_event_ref and shutdown_event_ref.is_set()):
-        if not vietnam_tz:
+    recover_interrupted_posts()
+    heap_ready = False
+    while not _is_shutting_down():
+        if not time_utils.vietnam_tz:
             log_func_ref("Scheduler: Waiting for timezone initialization...")
             if shutdown_event_ref and shutdown_event_ref.wait(timeout=10):
                 log_func_ref("Scheduler: Shutdown during timezone wait. Exiting.")
                 break
-            if not vietnam_tz:
+            if not time_utils.vietnam_tz:
                 continue
 
-        processed_something_in_cycle = False
+        # Cleared before draining changes, so a change arriving from here on still wakes the next sleep.
+        _wake_event.clear()
         try:
-            if not (shutdown_event_ref and shutdown_event_ref.is_set()):
-                processed_something_in_cycle = process_scheduled_posts()
+            if not heap_ready:
+                _rebuild_heap()
+                heap_ready = True
+            _apply_changes()
+            process_due_posts()
         except Exception as e:
-            if not (shutdown_event_ref and shutdown_event_ref.is_set()):
+            if not _is_shutting_down():
                 log_func_ref(f"SCHEDULER CRITICAL ERROR in loop: {e}")
+                heap_ready = False # Start over from the repository on the next pass
 
-        if shutdown_event_ref and shutdown_event_ref.is_set():
+        if _is_shutting_down():
             log_func_ref("Scheduler: Shutdown detected post-processing or error. Exiting loop.")
             break
 
@@ -149,8 +282,6 @@ def run_scheduler_loop():
             log_func_ref("Scheduler: Main thread closed. Stopping scheduler thread.")
             break
 
-        sleep_time = 30 if processed_something_in_cycle else 60
-        if shutdown_event_ref and shutdown_event_ref.wait(timeout=sleep_time):
-            log_func_ref("Scheduler: Shutdown during sleep. Exiting.")
-            break
-    log_func_ref("Scheduler thread finished.")
\ No newline at end of file
+        sleep_time = _seconds_until_next_due(time.time()) if heap_ready else SCHEDULER_RETRY_DELAY_SECONDS
+        _wake_event.wait(timeout=sleep_time)
+    log_func_ref("Scheduler thread finished.")
@@ -0,0 +1,46 @@
+# status_events.py
+# Channel from worker threads to the Tk main loop. post() is safe from any thread; the first event
+# of a burst asks the waker to schedule one drain, and the consumer handles everything queued by then.
+import queue
+import threading
+from collections import namedtuple
+
+UPDATE_UI = 'update_ui' # payload: None
+POST_CHANGED = 'post_changed' # payload: (action, post_id)
+PROGRESS = 'progress' # payload: dict with key, title, progress (0..1), mb_per_sec
+LOG = 'log' # payload: message string
+
+StatusEvent = namedtuple('StatusEvent', ['kind', 'payload'])
+
+class StatusEventQueue:
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._wake_pending = threading.Event()
+        self._waker = None
+
+    def set_waker(self, waker):
+        # waker() must arrange for drain() to run on the consumer thread soon, e.g. via root.after_idle.
+        self._waker = waker
+
+    def post(self, kind, payload=None):
+        self._queue.put(StatusEvent(kind, payload))
+        if self._waker and not self._wake_pending.is_set():
+            self._wake_pending.set()
+            try:
+                self._waker()
+            except Exception:
+                self._wake_pending.clear() # The consumer's safety poll still picks the event up
+
+    def put(self, message):
+        # Old-style plain messages, e.g. put("update_ui").
+        self.post(message)
+
+    def drain(self):
+        # Cleared first, so an event posted while draining schedules another wake-up.
+        self._wake_pending.clear()
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
@@ -2,19 +2,45 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
+import time
 import math
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
-import matplotlib.ticker as mticker
+from types import SimpleNamespace
 
-from youtube_api import fetch_video_stats
-from time_utils import convert_utc_to_vn_str
+from youtube_api import fetch_video_stats, fetch_video_stats_many
+from time_utils import convert_utc_to_vn_str, convert_utc_list_to_vn_str
 
 # Module-level variable for the canvas widget to manage its destruction
 canvas_widget_analytics = None
 
-def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func):
+# matplotlib and pandas dominate cold start, so they are imported on first use instead of with the module.
+# Figure (not pyplot) keeps charts out of pyplot's global figure registry.
+_plotting = None
+_plotting_lock = threading.Lock()
+
+def load_plotting():
+    global _plotting
+    with _plotting_lock:
+        if _plotting is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            import matplotlib.ticker as mticker
+            import pandas as pd
+            _plotting = SimpleNamespace(Figure=Figure, FigureCanvasTkAgg=FigureCanvasTkAgg, mticker=mticker, pd=pd)
+    return _plotting
+
+def warm_up_plotting(log_func=print):
+    # Imports the plotting stack on a background thread once the window is up.
+    def warm_up_task():
+        started = time.perf_counter()
+        try:
+            load_plotting()
+        except Exception as e:
+            log_func(f"Analytics: Could not preload plotting libraries: {e}")
+            return
+        log_func(f"Analytics: Plotting libraries loaded in {time.perf_counter() - started:.2f}s.")
+    threading.Thread(target=warm_up_task, name="plotting-warmup", daemon=True).start()
+
+def create_analytics_tab(notebook, root_ref, schedule_repo, log_func):
     analytics_tab = ttk.Frame(notebook, padding="15")
     status_bar = root_ref.status_bar
 
@@ -30,6 +56,8 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
     analytics_video_combobox.video_map = {} # To store display_title -> video_id
     analyze_video_btn = ttk.Button(combobox_frame, text="Analyze Selected", state=tk.DISABLED)
     analyze_video_btn.pack(side=tk.LEFT, padx=10)
+    analyze_all_btn = ttk.Button(combobox_frame, text="Analyze All Uploaded", state=tk.DISABLED)
+    analyze_all_btn.pack(side=tk.LEFT, padx=(0, 10))
 
     custom_id_controls_frame = ttk.Frame(analytics_controls_frame)
     custom_id_controls_frame.pack(side=tk.LEFT, fill='x', expand=True)
@@ -50,6 +78,8 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
     analytics_chart_labelframe.grid(row=0, column=0, padx=(0, 5), pady=5, sticky="nsew")
     analytics_chart_frame = ttk.Frame(analytics_chart_labelframe) # Actual frame for canvas
     analytics_chart_frame.pack(fill="both", expand=True)
+    chart_placeholder_label = ttk.Label(analytics_chart_frame, text="Analyze a video to see its chart.", anchor=tk.CENTER, foreground='gray')
+    chart_placeholder_label.pack(fill="both", expand=True)
 
     analytics_report_labelframe = ttk.LabelFrame(analytics_display_frame, text=" Statistics Report ", padding="5")
     analytics_report_labelframe.grid(row=0, column=1, padx=(5, 0), pady=5, sticky="nsew")
@@ -62,7 +92,8 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
         if canvas_widget_analytics:
             canvas_widget_analytics.get_tk_widget().destroy()
             canvas_widget_analytics = None
-            plt.close('all') # Close all matplotlib figures
+        if not chart_placeholder_label.winfo_manager():
+            chart_placeholder_label.pack(fill="both", expand=True)
         if analytics_report_text.winfo_exists():
             analytics_report_text.config(state=tk.NORMAL)
             analytics_report_text.delete("1.0", tk.END)
@@ -72,8 +103,8 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
         uploaded_videos = []
         analytics_video_combobox.video_map.clear()
 
-        for post in scheduled_posts_data_ref: # Use the ref
-            if post.get('status') == 'uploaded' and post.get('video_id'):
+        for post in schedule_repo:
+            if post.get('status') in ('uploaded', 'staged') and post.get('video_id'):
                 title = post.get('title', 'Untitled Video')
                 video_id = post.get('video_id')
                 display_title = f"{title} ({video_id})"
@@ -89,11 +120,13 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
                  analytics_video_combobox.current(0)
             analytics_video_combobox.config(state='readonly')
             analyze_video_btn.config(state=tk.NORMAL)
+            analyze_all_btn.config(state=tk.NORMAL)
         else:
             analytics_video_combobox['values'] = []
             analytics_video_combobox.set("No uploaded videos found")
             analytics_video_combobox.config(state='disabled')
             analyze_video_btn.config(state=tk.DISABLED)
+            analyze_all_btn.config(state=tk.DISABLED)
             clear_analytics_results_local()
         log_func(f"Analytics: Updated analyzable videos list: {len(uploaded_videos)} items.")
 
@@ -132,9 +165,12 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
 
         # Chart
         try:
+            plotting = load_plotting()
+            mticker = plotting.mticker
             data = {'Metric': ['Views', 'Likes', 'Comments'], 'Count': [views, likes, comments]}
-            df = pd.DataFrame(data)
-            fig, ax = plt.subplots(figsize=(6, 3.5), dpi=100) # Adjusted figsize
+            df = plotting.pd.DataFrame(data)
+            fig = plotting.Figure(figsize=(6, 3.5), dpi=100) # Adjusted figsize
+            ax = fig.add_subplot(111)
             bars = ax.bar(df['Metric'], df['Count'], color=['skyblue', 'lightcoral', 'lightgreen'])
             ax.set_ylabel('Count')
             chart_title_text = video_api_title[:45] + ("..." if len(video_api_title) > 45 else "") # Shorter title for chart
@@ -156,8 +192,9 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
                  if yval > 0 or (yval == 0 and max_val_for_ylim <=1): # Show 0 if all are 0
                      ax.text(bar.get_x() + bar.get_width()/2.0, yval, f'{yval:,}', va='bottom', ha='center', fontsize=8)
 
-            plt.tight_layout(pad=0.5) # Reduce padding
-            canvas_widget_analytics = FigureCanvasTkAgg(fig, master=analytics_chart_frame)
+            fig.tight_layout(pad=0.5) # Reduce padding
+            chart_placeholder_label.pack_forget()
+            canvas_widget_analytics = plotting.FigureCanvasTkAgg(fig, master=analytics_chart_frame)
             canvas_widget_analytics.draw()
             canvas_widget_analytics.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         except Exception as e_chart:
@@ -180,20 +217,103 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
         log_func(f"Analytics: Displayed analytics for '{display_identifier}'")
 
 
+    def display_batch_results_local(results, titles_by_id):
+        clear_analytics_results_local()
+        global canvas_widget_analytics
+
+        def safe_int(value):
+            try: return int(value)
+            except (ValueError, TypeError): return 0
+
+        rows, errors = [], []
+        for video_id, (video_data, error) in results.items():
+            if error or not video_data:
+                errors.append((titles_by_id.get(video_id, video_id), video_id, error or "No data"))
+                continue
+            stats = video_data.get('statistics', {})
+            title = video_data.get('snippet', {}).get('title') or titles_by_id.get(video_id, video_id)
+            rows.append((title, video_id, safe_int(stats.get('viewCount')), safe_int(stats.get('likeCount')), safe_int(stats.get('commentCount')),
+                         video_data.get('snippet', {}).get('publishedAt')))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        published_vn = convert_utc_list_to_vn_str([r[5] for r in rows], log_func=log_func)
+
+        if rows:
+            try:
+                top_rows = rows[:15] # Keep the chart readable
+                plotting = load_plotting()
+                df = plotting.pd.DataFrame([r[:5] for r in top_rows], columns=['Title', 'ID', 'Views', 'Likes', 'Comments'])
+                fig = plotting.Figure(figsize=(6, 3.5), dpi=100)
+                ax = fig.add_subplot(111)
+                labels = [t[:18] + ("..." if len(t) > 18 else "") for t in df['Title']]
+                ax.barh(labels[::-1], df['Views'][::-1], color='skyblue')
+                ax.set_xlabel('Views')
+                ax.set_title(f'Top {len(top_rows)} of {len(rows)} videos by views', fontsize=10)
+                ax.tick_params(axis='both', labelsize=8)
+                ax.spines['top'].set_visible(False); ax.spines['right'].set_visible(False)
+                ax.xaxis.set_major_formatter(plotting.mticker.FuncFormatter(lambda x, _: f'{int(x):,}'))
+                fig.tight_layout(pad=0.5)
+                chart_placeholder_label.pack_forget()
+                canvas_widget_analytics = plotting.FigureCanvasTkAgg(fig, master=analytics_chart_frame)
+                canvas_widget_analytics.draw()
+                canvas_widget_analytics.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+            except Exception as e_chart:
+                log_func(f"Analytics: Error creating batch chart: {e_chart}")
+
+        total_views = sum(r[2] for r in rows)
+        total_likes = sum(r[3] for r in rows)
+        total_comments = sum(r[4] for r in rows)
+        report_content = f"All uploaded videos: {len(results)} ({len(rows)} found, {len(errors)} failed)\n"
+        report_content += f"Total Views: {total_views:,}\nTotal Likes: {total_likes:,}\nTotal Comments: {total_comments:,}\n\n"
+        for (title, video_id, views, likes, comments, _), published in zip(rows, published_vn):
+            report_content += f"{title} ({video_id}) - Published (VN): {published}\n  Views: {views:,} | Likes: {likes:,} | Comments: {comments:,}\n"
+        if errors:
+            report_content += "\nErrors:\n"
+            for title, video_id, error in errors:
+                report_content += f"{title} ({video_id}): {error}\n"
+        if analytics_report_text.winfo_exists():
+            analytics_report_text.config(state=tk.NORMAL)
+            analytics_report_text.delete("1.0", tk.END)
+            analytics_report_text.insert("1.0", report_content)
+            analytics_report_text.config(state=tk.DISABLED)
+        log_func(f"Analytics: Displayed batch analytics for {len(rows)} videos ({len(errors)} errors).")
+
+    def set_analysis_buttons_state_local(state):
+        is_combobox_valid = analytics_video_combobox.get() and analytics_video_combobox.cget('state') != 'disabled'
+        list_state = state if is_combobox_valid else tk.DISABLED
+        analyze_video_btn.config(state=list_state)
+        analyze_all_btn.config(state=list_state)
+        analyze_custom_id_btn.config(state=state)
+
+    def analyze_all_uploaded_ui_local():
+        titles_by_id = {video_id: display_title.rsplit(' (', 1)[0]
+                        for display_title, video_id in analytics_video_combobox.video_map.items()}
+        if not titles_by_id:
+            messagebox.showwarning("No Videos", "There are no uploaded videos to analyze.")
+            return
+        log_func(f"Analytics: Batch analysis requested for {len(titles_by_id)} uploaded videos.")
+        clear_analytics_results_local()
+        set_analysis_buttons_state_local(tk.DISABLED)
+        if status_bar: status_bar.show_progress()
+
+        def batch_analysis_thread_task():
+            results = fetch_video_stats_many(list(titles_by_id), log_func=log_func)
+            root_ref.after(0, display_batch_results_local, results, titles_by_id)
+            root_ref.after(0, set_analysis_buttons_state_local, tk.NORMAL)
+            if status_bar:
+                root_ref.after(0, status_bar.hide_progress)
+                root_ref.after(0, status_bar.clear)
+        threading.Thread(target=batch_analysis_thread_task, daemon=True).start()
+
     def trigger_analysis_task(video_id_to_analyze, display_id_for_ui):
         log_func(f"Analytics: Analysis requested for: {display_id_for_ui} (Actual ID: {video_id_to_analyze})")
         clear_analytics_results_local()
-        analyze_video_btn.config(state=tk.DISABLED)
-        analyze_custom_id_btn.config(state=tk.DISABLED)
+        set_analysis_buttons_state_local(tk.DISABLED)
         if status_bar: status_bar.show_progress()
 
         def analysis_thread_task():
             video_data, error = fetch_video_stats(video_id_to_analyze, log_func=log_func)
             root_ref.after(0, display_analysis_results_local, video_data, error, display_id_for_ui)
-            
-            is_combobox_valid = analytics_video_combobox.get() and analytics_video_combobox.cget('state') != 'disabled'
-            root_ref.after(0, lambda: analyze_video_btn.config(state=tk.NORMAL if is_combobox_valid else tk.DISABLED))
-            root_ref.after(0, lambda: analyze_custom_id_btn.config(state=tk.NORMAL))
+            root_ref.after(0, set_analysis_buttons_state_local, tk.NORMAL)
             if status_bar:
                 root_ref.after(0, status_bar.hide_progress)
                 if error:
@@ -225,6 +345,7 @@ def create_analytics_tab(notebook, root_ref, scheduled_posts_data_ref, log_func)
     # Assign commands
     analyze_video_btn.config(command=analyze_selected_video_ui_local)
     analyze_custom_id_btn.config(command=analyze_custom_video_id_ui_local)
+    analyze_all_btn.config(command=analyze_all_uploaded_ui_local)
 
     # Initial population
     update_analyzable_videos_list_local()
@@ -101,6 +101,11 @@ def create_comments_tab(notebook, root_ref, comment_templates_list_ref, log_func
         post_is_enabled = state == tk.NORMAL and bool(current_random_comment_for_tab) and bool(video_id_entry.get().strip())
         post_comment_btn.config(state=tk.NORMAL if post_is_enabled else tk.DISABLED)
 
+    def save_templates_local():
+        # May run on a worker thread, so the error dialog goes through root.after.
+        if not save_comment_templates(comment_templates_list_ref, log_func):
+            root_ref.after(0, messagebox.showerror, "File Error", "Could not save comment templates. Check the log for details.")
+
     def add_comment_template_local():
         new_template = new_comment_entry.get().strip()
         if not new_template: return
@@ -111,7 +116,7 @@ def create_comments_tab(notebook, root_ref, comment_templates_list_ref, log_func
         comment_template_listbox.insert(tk.END, new_template) # Add to UI
         new_comment_entry.delete(0, tk.END)
         log_func(f"Comments: Added comment template: '{new_template}'")
-        save_comment_templates(comment_templates_list_ref, log_func)
+        save_templates_local()
 
     def delete_selected_comment_template_local():
         global current_random_comment_for_tab
@@ -126,7 +131,7 @@ def create_comments_tab(notebook, root_ref, comment_templates_list_ref, log_func
             del comment_templates_list_ref[selected_index]
             comment_template_listbox.delete(selected_index) # Remove from UI
             log_func(f"Comments: Deleted comment template: '{template_to_delete}'")
-            save_comment_templates(comment_templates_list_ref, log_func)
+            save_templates_local()
             if current_random_comment_for_tab == template_to_delete:
                 pick_random_comment_local(force_clear=True)
             set_comment_manage_buttons_state_local(tk.NORMAL)
@@ -229,7 +234,7 @@ def create_comments_tab(notebook, root_ref, comment_templates_list_ref, log_func
                         comment_templates_list_ref.append(c_item)
                         added_to_main_list_count +=1
                 if added_to_main_list_count > 0:
-                    save_comment_templates(comment_templates_list_ref, log_func)
+                    save_templates_local()
                 msg = f"{added_to_main_list_count} new comment templates added."
                 log_func(f"Comments: {msg}")
                 root_ref.after(0, messagebox.showinfo, "Success", msg)
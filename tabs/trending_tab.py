@@ -2,7 +2,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
-from youtube_api import fetch_trending_videos
+from youtube_api import fetch_trending_videos_multi
 
 def create_trending_tab(notebook, root_ref, log_func):
     trending_tab = ttk.Frame(notebook, padding="15")
@@ -12,30 +12,34 @@ def create_trending_tab(notebook, root_ref, log_func):
     trending_controls_frame = ttk.Frame(trending_tab)
     trending_controls_frame.pack(pady=10, fill="x")
 
-    ttk.Label(trending_controls_frame, text="Region Code:").pack(side=tk.LEFT, padx=(0, 5))
-    region_code_entry = ttk.Entry(trending_controls_frame, width=5)
+    ttk.Label(trending_controls_frame, text="Region Codes:").pack(side=tk.LEFT, padx=(0, 5))
+    region_code_entry = ttk.Entry(trending_controls_frame, width=20)
     region_code_entry.insert(0, "VN")
     region_code_entry.pack(side=tk.LEFT, padx=5)
 
     fetch_trending_btn = ttk.Button(trending_controls_frame, text="Get Trending")
     fetch_trending_btn.pack(side=tk.LEFT, padx=10)
 
-    trending_status_label = ttk.Label(trending_controls_frame, text="Enter 2-letter code (e.g., VN, US)")
+    trending_status_label = ttk.Label(trending_controls_frame, text="Enter 2-letter codes, comma separated (e.g., VN, US)")
     trending_status_label.pack(side=tk.LEFT, padx=10, fill='x', expand=True)
 
     # --- List Frame ---
     trending_list_frame = ttk.LabelFrame(trending_tab, text=" Top Trending Videos ", padding="10")
     trending_list_frame.pack(pady=10, fill="both", expand=True)
 
-    columns_trend = ('title', 'channel', 'views')
+    columns_trend = ('title', 'channel', 'views', 'regions')
     trending_list_treeview = ttk.Treeview(trending_list_frame, columns=columns_trend, show='headings')
     trending_list_treeview.heading('title', text='Title', anchor=tk.W) # Changed to W
     trending_list_treeview.heading('channel', text='Channel', anchor=tk.W) # Changed to W
     trending_list_treeview.heading('views', text='View Count', anchor=tk.E) # Changed to E
+    trending_list_treeview.heading('regions', text='Regions', anchor=tk.W)
 
-    trending_list_treeview.column('title', width=550, stretch=tk.YES, anchor='w')
-    trending_list_treeview.column('channel', width=200, stretch=tk.NO, anchor='w')
-    trending_list_treeview.column('views', width=150, stretch=tk.NO, anchor='e')
+    trending_list_treeview.column('title', width=480, stretch=tk.YES, anchor='w')
+    trending_list_treeview.column('channel', width=180, stretch=tk.NO, anchor='w')
+    trending_list_treeview.column('views', width=130, stretch=tk.NO, anchor='e')
+    trending_list_treeview.column('regions', width=110, stretch=tk.NO, anchor='w')
+    trending_list_treeview.tag_configure('oddrow', background='#F0F0F0')
+    trending_list_treeview.tag_configure('evenrow', background='white')
 
     scrollbar_trend = ttk.Scrollbar(trending_list_frame, orient=tk.VERTICAL, command=trending_list_treeview.yview)
     trending_list_treeview.configure(yscroll=scrollbar_trend.set)
@@ -47,28 +51,13 @@ def create_trending_tab(notebook, root_ref, log_func):
         for item in trending_list_treeview.get_children():
             trending_list_treeview.delete(item)
         if message:
-             trending_list_treeview.insert('', tk.END, values=(message, "", ""))
+             trending_list_treeview.insert('', tk.END, values=(message, "", "", ""), iid="trend_message")
 
-    def display_trending_results_local(videos, region):
-        clear_trending_results_local()
-        trending_list_treeview.tag_configure('oddrow', background='#F0F0F0')
-        trending_list_treeview.tag_configure('evenrow', background='white')
-
-        if videos is None:
-            log_func(f"Trending: Failed to display trending for {region} (fetch error).")
-            trending_list_treeview.insert('', tk.END, values=(f"Error fetching videos for {region}", "", ""))
-            trending_status_label.config(text=f"Region: {region} (Error)")
-            return
-
-        if not videos:
-            log_func(f"Trending: No trending videos found for region: {region}.")
-            trending_list_treeview.insert('', tk.END, values=(f"No trending videos found for {region}", "", ""))
-            trending_status_label.config(text=f"Region: {region} (No videos)")
-            return
-
-        log_func(f"Trending: Displaying {len(videos)} trending videos for region: {region}.")
-        trending_status_label.config(text=f"Trending: {region} ({len(videos)} videos)")
-        for i, video in enumerate(videos):
+    def append_trending_page_local(region, new_videos, repeated_videos):
+        if trending_list_treeview.exists("trend_message"):
+            trending_list_treeview.delete("trend_message")
+        row_count = len(trending_list_treeview.get_children())
+        for i, video in enumerate(new_videos, start=row_count):
             snippet = video.get('snippet', {})
             stats = video.get('statistics', {})
             title = snippet.get('title', 'N/A')
@@ -76,32 +65,60 @@ def create_trending_tab(notebook, root_ref, log_func):
             view_count_str = stats.get('viewCount')
             view_count_formatted = f"{int(view_count_str):,}" if view_count_str and view_count_str.isdigit() else 'N/A'
             row_tag = 'oddrow' if i % 2 else 'evenrow'
-            trending_list_treeview.insert('', tk.END, values=(title, channel, view_count_formatted), iid=f"trend_{i}", tags=(row_tag,))
+            trending_list_treeview.insert('', tk.END, values=(title, channel, view_count_formatted, ", ".join(video['regions'])),
+                                          iid=f"trend_{video.get('id')}", tags=(row_tag,))
+        for video in repeated_videos:
+            iid = f"trend_{video.get('id')}"
+            if trending_list_treeview.exists(iid):
+                trending_list_treeview.set(iid, 'regions', ", ".join(video['regions']))
+        trending_status_label.config(text=f"Loading... {len(trending_list_treeview.get_children())} videos (last page: {region})")
+
+    def finish_trending_fetch_local(videos, errors, regions):
+        region_text = ", ".join(regions)
+        if videos is None or (not videos and errors):
+            log_func(f"Trending: Failed to display trending for {region_text} (fetch error).")
+            clear_trending_results_local(f"Error fetching videos for {region_text}")
+            trending_status_label.config(text=f"Regions: {region_text} (Error)")
+            return
+        if not videos:
+            log_func(f"Trending: No trending videos found for regions: {region_text}.")
+            clear_trending_results_local(f"No trending videos found for {region_text}")
+            trending_status_label.config(text=f"Regions: {region_text} (No videos)")
+            return
+        status_text = f"Trending: {region_text} ({len(videos)} unique videos)"
+        if errors:
+            status_text += f" - failed: {', '.join(sorted(errors))}"
+        log_func(f"Trending: Displayed {len(videos)} unique trending videos for regions: {region_text}.")
+        trending_status_label.config(text=status_text)
 
     def fetch_and_display_trending_local():
-        region = region_code_entry.get().strip().upper()
-        if not region or len(region) != 2 or not region.isalpha():
-            messagebox.showwarning("Invalid Input", "Region Code must be 2 letters (e.g., VN, US).")
+        regions = [r.strip().upper() for r in region_code_entry.get().replace(';', ',').split(',') if r.strip()]
+        regions = list(dict.fromkeys(regions))
+        if not regions or any(len(r) != 2 or not r.isalpha() for r in regions):
+            messagebox.showwarning("Invalid Input", "Region Codes must be 2 letters, separated by commas (e.g., VN, US).")
             return
 
         def fetch_task():
             root_ref.after(0, lambda: fetch_trending_btn.config(state=tk.DISABLED))
             if status_bar: root_ref.after(0, status_bar.show_progress)
-            log_func(f"Trending: Starting fetch for trending videos (Region: {region})...")
+            log_func(f"Trending: Starting fetch for trending videos (Regions: {', '.join(regions)})...")
+
+            def on_page(region, new_videos, repeated_videos):
+                root_ref.after(0, append_trending_page_local, region, new_videos, repeated_videos)
 
-            trending_videos_data = fetch_trending_videos(region, log_func=log_func) # Pass log_func
-            fetch_successful = trending_videos_data is not None
+            videos, errors = fetch_trending_videos_multi(regions, on_page=on_page, log_func=log_func)
+            fetch_successful = videos is not None and not (errors and not videos)
 
-            root_ref.after(0, display_trending_results_local, trending_videos_data, region)
+            root_ref.after(0, finish_trending_fetch_local, videos, errors, regions)
             root_ref.after(0, lambda: fetch_trending_btn.config(state=tk.NORMAL))
             if status_bar:
                  root_ref.after(0, status_bar.hide_progress)
                  if not fetch_successful:
-                     root_ref.after(0, status_bar.set_text, f"Failed to fetch trending for {region}.")
+                     root_ref.after(0, status_bar.set_text, f"Failed to fetch trending for {', '.join(regions)}.")
                  else:
                      root_ref.after(0, status_bar.clear)
 
-        trending_status_label.config(text=f"Fetching for {region}...")
+        trending_status_label.config(text=f"Fetching for {', '.join(regions)}...")
         clear_trending_results_local("Loading...")
         threading.Thread(target=fetch_task, daemon=True).start()
 
@@ -4,12 +4,12 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
 import threading
 
-from file_handler import save_scheduled_posts
-from youtube_api import upload_video
-from time_utils import convert_vn_str_to_utc_iso, convert_utc_to_vn_str
+from time_utils import convert_vn_str_to_utc_iso, VN_TIME_FORMAT
+from config import SCHEDULE_LIST_PAGE_SIZE
+from status_events import PROGRESS
 import datetime # For min_schedule_time
 
-def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_queue_ref, log_func, refresh_all_tabs_func):
+def create_uploader_tab(notebook, root_ref, schedule_repo, status_queue_ref, log_func, refresh_all_tabs_func, upload_engine):
     uploader_tab = ttk.Frame(notebook, padding="15")
     uploader_tab.columnconfigure(0, weight=1)
     uploader_tab.rowconfigure(1, weight=1) # Allow list frame to expand
@@ -58,9 +58,29 @@ def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_que
     # --- List Frame ---
     list_frame = ttk.LabelFrame(uploader_tab, text=" Scheduled & Uploaded Posts ", padding="10")
     list_frame.grid(row=1, column=0, padx=0, pady=15, sticky="nsew")
-    list_frame.rowconfigure(0, weight=1)
+    list_frame.rowconfigure(1, weight=1)
     list_frame.columnconfigure(0, weight=1)
 
+    filter_frame = ttk.Frame(list_frame)
+    filter_frame.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 8))
+    ttk.Label(filter_frame, text="Status:").pack(side=tk.LEFT, padx=(0, 5))
+    status_filter_combobox = ttk.Combobox(filter_frame, width=11, state='readonly',
+                                          values=('All', 'pending', 'processing', 'staged', 'uploaded', 'error', 'cancelled'))
+    status_filter_combobox.set('All')
+    status_filter_combobox.pack(side=tk.LEFT, padx=(0, 10))
+    ttk.Label(filter_frame, text="From (VN):").pack(side=tk.LEFT, padx=(0, 5))
+    date_from_entry = ttk.Entry(filter_frame, width=11)
+    date_from_entry.pack(side=tk.LEFT, padx=(0, 10))
+    ttk.Label(filter_frame, text="To (VN):").pack(side=tk.LEFT, padx=(0, 5))
+    date_to_entry = ttk.Entry(filter_frame, width=11)
+    date_to_entry.pack(side=tk.LEFT, padx=(0, 10))
+    ttk.Label(filter_frame, text="Title:").pack(side=tk.LEFT, padx=(0, 5))
+    title_filter_entry = ttk.Entry(filter_frame, width=20)
+    title_filter_entry.pack(side=tk.LEFT, padx=(0, 10))
+    apply_filter_btn = ttk.Button(filter_frame, text="Apply")
+    apply_filter_btn.pack(side=tk.LEFT, padx=(0, 5))
+    ttk.Label(filter_frame, text="(dates: YYYY-MM-DD)", foreground="grey").pack(side=tk.LEFT)
+
     columns_sched = ('title', 'time_vn', 'status')
     scheduled_list_treeview = ttk.Treeview(list_frame, columns=columns_sched, show='headings', height=8)
     scheduled_list_treeview.heading('title', text='Title', anchor='w')
@@ -71,11 +91,17 @@ def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_que
     scheduled_list_treeview.column('status', width=100, stretch=tk.NO, anchor='center')
     scrollbar_sched = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=scheduled_list_treeview.yview)
     scheduled_list_treeview.configure(yscroll=scrollbar_sched.set)
-    scheduled_list_treeview.grid(row=0, column=0, sticky="nsew")
-    scrollbar_sched.grid(row=0, column=1, sticky="ns")
+    scheduled_list_treeview.grid(row=1, column=0, sticky="nsew")
+    scrollbar_sched.grid(row=1, column=1, sticky="ns")
 
     button_frame_list = ttk.Frame(list_frame)
-    button_frame_list.grid(row=1, column=0, columnspan=2, pady=(10, 0))
+    button_frame_list.grid(row=2, column=0, columnspan=2, pady=(10, 0))
+    prev_page_btn = ttk.Button(button_frame_list, text="< Prev", width=8)
+    prev_page_btn.pack(side=tk.LEFT, padx=(10, 2))
+    page_info_label = ttk.Label(button_frame_list, text="", width=24, anchor=tk.CENTER)
+    page_info_label.pack(side=tk.LEFT, padx=2)
+    next_page_btn = ttk.Button(button_frame_list, text="Next >", width=8)
+    next_page_btn.pack(side=tk.LEFT, padx=(2, 10))
     refresh_list_btn = ttk.Button(button_frame_list, text="Refresh List")
     refresh_list_btn.pack(side=tk.LEFT, padx=10)
     delete_post_btn = ttk.Button(button_frame_list, text="Delete Selected (List Only)")
@@ -120,7 +146,9 @@ def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_que
                 messagebox.showerror("Input Error", "Please enter the schedule time (Vietnam Time).")
                 return False, None, None
             utc_dt, utc_iso_str = convert_vn_str_to_utc_iso(scheduled_time_str_vn.strip(), log_func=log_func)
-            if utc_dt is None: return False, None, None
+            if utc_dt is None:
+                messagebox.showerror("Invalid Time Format", f"Invalid time format.\nPlease use: {VN_TIME_FORMAT} (Vietnam Time).")
+                return False, None, None
             log_func(f"Uploader: VN time '{scheduled_time_str_vn}' validated and converted to UTC: {utc_iso_str}")
         return True, utc_dt, utc_iso_str
 
@@ -142,55 +170,171 @@ def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_que
         if scheduled_list_treeview.selection():
              scheduled_list_treeview.selection_remove(scheduled_list_treeview.selection())
 
+    scheduled_list_treeview.tag_configure('oddrow', background='#F0F0F0')
+    scheduled_list_treeview.tag_configure('evenrow', background='white')
+    scheduled_list_treeview.tag_configure('uploaded', foreground='green')
+    scheduled_list_treeview.tag_configure('error', foreground='red')
+    scheduled_list_treeview.tag_configure('pending', foreground='blue')
+    scheduled_list_treeview.tag_configure('processing', foreground='orange') # Might be set by scheduler
+    scheduled_list_treeview.tag_configure('staged', foreground='purple') # Uploaded early, waiting for publishAt
+    status_tag_map = {'uploaded': 'uploaded', 'pending': 'pending', 'processing': 'processing', 'staged': 'staged'}
+
+    # Only one page of the (filtered, sorted) schedule is materialised as Treeview rows. rendered_rows maps
+    # the post id of each visible row to what it shows, so a refresh only touches rows that changed.
+    rendered_rows = {}
+    list_state = {'refresh_pending': False, 'uploaded_key': None, 'generation': 0, 'page': 0,
+                  'sort_by': None, 'descending': False, 'filters': {}}
+    sort_columns = {'title': 'title', 'time_vn': 'time', 'status': 'status'}
+
+    def build_row_local(index, post):
+        status_val = post.get('status', 'N/A')
+        time_vn_str = schedule_repo.schedule_times(post)[1] if post.get('scheduled_time') else "Uploaded Now"
+        status_tag = status_tag_map.get(status_val)
+        if not status_tag and status_val and status_val.startswith('error'):
+            status_tag = 'error'
+        row_tag = 'oddrow' if index % 2 else 'evenrow'
+        tags = (row_tag, status_tag) if status_tag else (row_tag,)
+        return (post.get('title', 'N/A'), time_vn_str, status_val), tags
+
+    def read_filters_local():
+        # Read on the Tk thread; returns None (after telling the user) if a date does not parse.
+        filters = {}
+        status_val = status_filter_combobox.get()
+        if status_val and status_val != 'All':
+            filters['statuses'] = {status_val}
+        for key, entry, day_offset in (('start_epoch', date_from_entry, 0), ('end_epoch', date_to_entry, 1)):
+            date_str = entry.get().strip()
+            if not date_str:
+                continue
+            utc_dt, _ = convert_vn_str_to_utc_iso(date_str, fmt='%Y-%m-%d', log_func=log_func)
+            if utc_dt is None:
+                messagebox.showerror("Filter Error", f"Invalid date '{date_str}'.\nPlease use YYYY-MM-DD (Vietnam Time).")
+                return None
+            filters[key] = (utc_dt + datetime.timedelta(days=day_offset)).timestamp() # 'To' includes the whole day
+        title_val = title_filter_entry.get().strip()
+        if title_val:
+            filters['text'] = title_val
+        return filters
+
+    def query_page_task(generation, filters, sort_by, descending, page):
+        # Worker thread: filter and sort the whole schedule, then build only the requested page.
+        try:
+            posts = schedule_repo.query(sort_by=sort_by, descending=descending, **filters)
+            all_posts = schedule_repo.snapshot() if filters else posts
+            uploaded_key = frozenset((post['id'], post.get('title'), post.get('video_id')) for post in all_posts
+                                     if post.get('status') in ('uploaded', 'staged') and post.get('video_id'))
+            page_count = max(1, -(-len(posts) // SCHEDULE_LIST_PAGE_SIZE))
+            page = min(page, page_count - 1)
+            first = page * SCHEDULE_LIST_PAGE_SIZE
+            page_rows = [(post['id'], build_row_local(i, post))
+                         for i, post in enumerate(posts[first:first + SCHEDULE_LIST_PAGE_SIZE])]
+        except Exception as e:
+            log_func(f"Uploader: Error building the scheduled posts list: {e}")
+            return
+        try:
+            root_ref.after(0, apply_page_local, generation, page, page_count, len(posts), page_rows, uploaded_key)
+        except RuntimeError:
+            pass # Main loop already gone (application closing)
+
+    def apply_page_local(generation, page, page_count, total, page_rows, uploaded_key):
+        if generation != list_state['generation'] or not scheduled_list_treeview.winfo_exists():
+            return # A newer query is already under way
+        list_state['page'] = page
+        wanted_ids = {post_id for post_id, _ in page_rows}
+        for post_id in [iid for iid in rendered_rows if iid not in wanted_ids]:
+            scheduled_list_treeview.delete(post_id)
+            del rendered_rows[post_id]
+        for index, (post_id, row) in enumerate(page_rows):
+            if post_id not in rendered_rows:
+                scheduled_list_treeview.insert('', index, iid=post_id, values=row[0], tags=row[1])
+            else:
+                if rendered_rows[post_id] != row:
+                    scheduled_list_treeview.item(post_id, values=row[0], tags=row[1])
+                if scheduled_list_treeview.index(post_id) != index:
+                    scheduled_list_treeview.move(post_id, '', index)
+            rendered_rows[post_id] = row
+
+        first = page * SCHEDULE_LIST_PAGE_SIZE
+        page_info_label.config(text=f"{first + 1 if total else 0}-{first + len(page_rows)} of {total}")
+        prev_page_btn.config(state=tk.NORMAL if page > 0 else tk.DISABLED)
+        next_page_btn.config(state=tk.NORMAL if page < page_count - 1 else tk.DISABLED)
+
+        # Other tabs (analytics) only care about which videos are uploaded.
+        if uploaded_key != list_state['uploaded_key']:
+            list_state['uploaded_key'] = uploaded_key
+            refresh_all_tabs_func()
+
+    def start_list_query_local():
+        list_state['refresh_pending'] = False
+        if not scheduled_list_treeview.winfo_exists():
+            return
+        list_state['generation'] += 1
+        threading.Thread(target=query_page_task, daemon=True,
+                         args=(list_state['generation'], dict(list_state['filters']), list_state['sort_by'],
+                               list_state['descending'], list_state['page'])).start()
+
     def refresh_scheduled_list_local():
-        scheduled_list_treeview.tag_configure('oddrow', background='#F0F0F0')
-        scheduled_list_treeview.tag_configure('evenrow', background='white')
-        scheduled_list_treeview.tag_configure('uploaded', foreground='green')
-        scheduled_list_treeview.tag_configure('error', foreground='red')
-        scheduled_list_treeview.tag_configure('pending', foreground='blue')
-        scheduled_list_treeview.tag_configure('processing', foreground='orange') # Might be set by scheduler
-
-        for item in scheduled_list_treeview.get_children():
-            scheduled_list_treeview.delete(item)
-
-        for i, post in enumerate(scheduled_posts_data_ref):
-            title_val = post.get('title', 'N/A')
-            status_val = post.get('status', 'N/A')
-            time_utc_str = post.get('scheduled_time', '')
-            time_vn_str = convert_utc_to_vn_str(time_utc_str, log_func=log_func) if time_utc_str else "Uploaded Now"
-
-            row_tag = 'oddrow' if i % 2 else 'evenrow'
-            status_tag_map = {'uploaded': 'uploaded', 'pending': 'pending', 'processing': 'processing'}
-            status_tag = status_tag_map.get(status_val)
-            if not status_tag and status_val and status_val.startswith('error'):
-                status_tag = 'error'
-            tags = (row_tag, status_tag) if status_tag else (row_tag,)
-            scheduled_list_treeview.insert('', tk.END, values=(title_val, time_vn_str, status_val), iid=str(i), tags=tags)
-        # After refreshing this list, tell main app to refresh other dependent lists (like analytics)
-        refresh_all_tabs_func()
+        # Requests from the same event-loop pass collapse into one query.
+        if list_state['refresh_pending']:
+            return
+        list_state['refresh_pending'] = True
+        root_ref.after_idle(start_list_query_local)
+
+    def apply_filters_local(event=None):
+        filters = read_filters_local()
+        if filters is None:
+            return
+        list_state['filters'] = filters
+        list_state['page'] = 0
+        refresh_scheduled_list_local()
+
+    def change_page_local(step):
+        list_state['page'] = max(0, list_state['page'] + step)
+        refresh_scheduled_list_local()
+
+    def sort_by_column_local(column):
+        sort_by = sort_columns[column]
+        if list_state['sort_by'] == sort_by:
+            if list_state['descending']: # Third click returns to schedule order
+                list_state['sort_by'], list_state['descending'] = None, False
+            else:
+                list_state['descending'] = True
+        else:
+            list_state['sort_by'], list_state['descending'] = sort_by, False
+        for col, text in (('title', 'Title'), ('time_vn', 'Time (VN) / Status'), ('status', 'Status')):
+            arrow = ''
+            if list_state['sort_by'] == sort_columns[col]:
+                arrow = ' \u25bc' if list_state['descending'] else ' \u25b2'
+            scheduled_list_treeview.heading(col, text=text + arrow)
+        list_state['page'] = 0
+        refresh_scheduled_list_local()
 
 
     def on_scheduled_item_select_local(event):
         selected_items = scheduled_list_treeview.selection()
         if not selected_items: return
-        try:
-            index = int(selected_items[0])
-            if 0 <= index < len(scheduled_posts_data_ref):
-                post_data = scheduled_posts_data_ref[index]
-                clear_input_fields_local() # Clear first
-                video_path_entry.insert(0, post_data.get('video_path', ''))
-                title_entry.insert(0, post_data.get('title', ''))
-                description_text.insert("1.0", post_data.get('description', ''))
-                thumbnail_path_entry.insert(0, post_data.get('thumbnail_path', ''))
-                utc_time_str = post_data.get('scheduled_time', '')
-                if utc_time_str:
-                    vn_time_str = convert_utc_to_vn_str(utc_time_str, log_func=log_func)
-                    if vn_time_str != "N/A" and vn_time_str != "Invalid Date":
-                        datetime_entry.insert(0, vn_time_str)
-            else: clear_input_fields_local()
-        except (ValueError, IndexError): clear_input_fields_local()
+        post_data = schedule_repo.get(selected_items[0])
+        if post_data:
+            clear_input_fields_local() # Clear first
+            video_path_entry.insert(0, post_data.get('video_path', ''))
+            title_entry.insert(0, post_data.get('title', ''))
+            description_text.insert("1.0", post_data.get('description', ''))
+            thumbnail_path_entry.insert(0, post_data.get('thumbnail_path', ''))
+            utc_time_str = post_data.get('scheduled_time', '')
+            if utc_time_str:
+                vn_time_str = schedule_repo.schedule_times(post_data)[1]
+                if vn_time_str != "N/A" and vn_time_str != "Invalid Date":
+                    datetime_entry.insert(0, vn_time_str)
+        else: clear_input_fields_local()
+
+    def check_schedule_writable_local():
+        if schedule_repo.read_only:
+            messagebox.showerror("Schedule Unavailable", "The scheduled posts file could not be loaded, so posts cannot be added, uploaded or deleted.\nRepair or restore it, then restart the application.")
+            return False
+        return True
 
     def schedule_upload_ui_local():
+        if not check_schedule_writable_local(): return
         is_valid, utc_dt, scheduled_time_utc_iso = validate_inputs_local(check_time=True)
         if not is_valid: return
 
@@ -206,14 +350,14 @@ def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_que
             "thumbnail_path": thumbnail_path_entry.get() or None,
             "status": "pending", "video_id": None
         }
-        scheduled_posts_data_ref.append(new_post)
-        save_scheduled_posts(scheduled_posts_data_ref, log_func)
+        schedule_repo.add(new_post)
         log_func(f"Uploader: Scheduled '{new_post['title']}' for {datetime_entry.get().strip()} (VN) / {scheduled_time_utc_iso} (UTC).")
         messagebox.showinfo("Success", f"Video upload scheduled:\nTitle: '{new_post['title']}'\nAt: {datetime_entry.get().strip()} (VN)")
         clear_input_fields_local()
         refresh_scheduled_list_local()
 
     def upload_now_ui_local():
+        if not check_schedule_writable_local(): return # The finished upload could not be recorded
         is_valid, _, _ = validate_inputs_local(check_time=False)
         if not is_valid: return
         if not messagebox.askyesno("Confirm Upload", "Upload this video immediately as Public?"):
@@ -224,12 +368,8 @@ def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_que
         desc_v = description_text.get("1.0", tk.END).strip()
         thumb_p = thumbnail_path_entry.get()
 
-        def upload_task():
-            root_ref.after(0, set_uploader_buttons_state_local, tk.DISABLED)
-            if status_bar: root_ref.after(0, status_bar.show_progress)
-            log_func(f"Uploader: Starting immediate upload task for '{title_v}'...")
-
-            response = upload_video(video_p, title_v, desc_v, thumb_p, publish_time_utc_iso=None, log_func=log_func)
+        def on_upload_done(job):
+            response = job.response
             upload_successful = False
             if response and 'id' in response:
                 video_id = response.get('id')
@@ -241,10 +381,12 @@ def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_que
                     "scheduled_time": None, "thumbnail_path": thumb_p or None,
                     "status": "uploaded", "video_id": video_id
                 }
-                scheduled_posts_data_ref.append(uploaded_post_entry)
-                save_scheduled_posts(scheduled_posts_data_ref, log_func)
-                # status_queue_ref.put("update_ui") # This will trigger refresh_all_tabs_func
-                root_ref.after(0, refresh_scheduled_list_local) # Directly refresh this tab's list
+                schedule_repo.add(uploaded_post_entry)
+                # The repository's change listener posts a post_changed event, which refreshes the list
+            elif job.state == 'failed':
+                root_ref.after(0, messagebox.showerror, "Upload Error", job.error or f"Could not upload video '{title_v}'.")
+            if job.warning:
+                root_ref.after(0, messagebox.showwarning, "Thumbnail Warning", job.warning)
 
             root_ref.after(0, set_uploader_buttons_state_local, tk.NORMAL)
             if status_bar:
@@ -255,41 +397,67 @@ def create_uploader_tab(notebook, root_ref, scheduled_posts_data_ref, status_que
                     root_ref.after(0, status_bar.clear)
                     root_ref.after(0, clear_input_fields_local)
 
-        threading.Thread(target=upload_task, daemon=True).start()
-        log_func("Uploader: Background thread for immediate upload started.")
+        def on_upload_progress(job, info):
+            status_queue_ref.post(PROGRESS, {'key': job.job_id, 'title': title_v,
+                                             'progress': info.get('progress'), 'mb_per_sec': info.get('mb_per_sec')})
+
+        set_uploader_buttons_state_local(tk.DISABLED)
+        if status_bar: status_bar.show_progress()
+        log_func(f"Uploader: Starting immediate upload task for '{title_v}'...")
+        try:
+            upload_engine.submit(video_p, title_v, desc_v, thumb_p, publish_time_utc_iso=None,
+                                 on_progress=on_upload_progress, on_done=on_upload_done)
+        except RuntimeError as e:
+            log_func(f"Uploader: Could not queue immediate upload for '{title_v}': {e}")
+            set_uploader_buttons_state_local(tk.NORMAL)
+            if status_bar: status_bar.hide_progress()
+            return
+        log_func("Uploader: Immediate upload queued on the upload engine.")
 
     def delete_selected_post_local():
+        if not check_schedule_writable_local(): return
         selected_items = scheduled_list_treeview.selection()
         if not selected_items:
             messagebox.showwarning("No Selection", "Please select a post to delete.")
             return
-        try:
-            index_to_delete = int(selected_items[0])
-            if 0 <= index_to_delete < len(scheduled_posts_data_ref):
-                post_to_delete = scheduled_posts_data_ref[index_to_delete]
-                title_val = post_to_delete.get('title', 'Untitled')
-                status_val = post_to_delete.get('status', 'N/A')
-                confirm_msg = f"Delete '{title_val}' from this list?\nStatus: {status_val}\n\n"
-                if status_val == 'pending': confirm_msg += "(This removes it from the schedule.)"
-                elif status_val == 'uploaded': confirm_msg += "(Removes from list only, the YouTube video is NOT deleted.)"
-                else: confirm_msg += "(Removes from list.)"
-
-                if messagebox.askyesno("Confirm Deletion", confirm_msg):
-                    del scheduled_posts_data_ref[index_to_delete]
-                    save_scheduled_posts(scheduled_posts_data_ref, log_func)
+        post_id = selected_items[0]
+        post_to_delete = schedule_repo.get(post_id)
+        if post_to_delete:
+            title_val = post_to_delete.get('title', 'Untitled')
+            status_val = post_to_delete.get('status', 'N/A')
+            if status_val == 'processing':
+                # The upload is already running; deleting would orphan a video that still goes public at its slot.
+                messagebox.showwarning("Upload In Progress", f"'{title_val}' is being uploaded right now and cannot be deleted.\nWait for the upload to finish, then delete it.")
+                return
+            confirm_msg = f"Delete '{title_val}' from this list?\nStatus: {status_val}\n\n"
+            if status_val == 'pending': confirm_msg += "(This removes it from the schedule.)"
+            elif status_val in ('uploaded', 'staged'): confirm_msg += "(Removes from list only, the YouTube video is NOT deleted.)"
+            else: confirm_msg += "(Removes from list.)"
+
+            if messagebox.askyesno("Confirm Deletion", confirm_msg):
+                if schedule_repo.delete(post_id, allow=lambda post: post.get('status') != 'processing') is None:
+                    messagebox.showwarning("Not Deleted", f"'{title_val}' started uploading or was removed meanwhile, so it was not deleted.")
                     refresh_scheduled_list_local()
-                    clear_input_fields_local()
-                    log_func(f"Uploader: Deleted '{title_val}' from schedule list.")
-            else:
-                messagebox.showerror("Error", "Could not delete (invalid index). Please refresh.")
-        except (ValueError, IndexError) as e:
-            messagebox.showerror("Error", f"Could not delete selected post:\n{e}")
+                    return
+                refresh_scheduled_list_local()
+                clear_input_fields_local()
+                log_func(f"Uploader: Deleted '{title_val}' from schedule list.")
+        else:
+            messagebox.showerror("Error", "Could not delete (post no longer exists). Please refresh.")
 
     # Assign commands
     upload_now_btn.config(command=upload_now_ui_local)
     schedule_btn.config(command=schedule_upload_ui_local)
     clear_btn.config(command=clear_input_fields_local)
     refresh_list_btn.config(command=refresh_scheduled_list_local)
+    apply_filter_btn.config(command=apply_filters_local)
+    prev_page_btn.config(command=lambda: change_page_local(-1))
+    next_page_btn.config(command=lambda: change_page_local(1))
+    for entry_widget in (date_from_entry, date_to_entry, title_filter_entry):
+        entry_widget.bind('<Return>', apply_filters_local)
+    status_filter_combobox.bind('<<ComboboxSelected>>', apply_filters_local)
+    for column in columns_sched:
+        scheduled_list_treeview.heading(column, command=lambda c=column: sort_by_column_local(c))
     delete_post_btn.config(command=delete_selected_post_local)
     scheduled_list_treeview.bind('<<TreeviewSelect>>', on_scheduled_item_select_local)
 
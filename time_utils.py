@@ -1,59 +1,81 @@
 # time_utils.py
 import datetime
-import pytz
-from tkinter import messagebox
-from config import VIETNAM_TZ_STR
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError: # Python < 3.9
+    ZoneInfo, ZoneInfoNotFoundError = None, Exception
+
+from config import VIETNAM_TZ_STR, VIETNAM_UTC_OFFSET_HOURS
+
+VN_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 vietnam_tz = None
 
 def initialize_timezone(log_func=print):
     global vietnam_tz
-    try:
-        vietnam_tz = pytz.timezone(VIETNAM_TZ_STR)
-        log_func(f"Timezone '{VIETNAM_TZ_STR}' loaded successfully.")
-        return True
-    except pytz.exceptions.UnknownTimeZoneError:
-        log_func(f"ERROR: Timezone '{VIETNAM_TZ_STR}' not found.")
-        messagebox.showerror("Timezone Error",
-                             f"Could not find the timezone '{VIETNAM_TZ_STR}'.\n"
-                             f"Please ensure the 'pytz' library is installed correctly (`pip install pytz`).")
-        return False
-    except Exception as e:
-        log_func(f"ERROR initializing timezone: {e}")
-        messagebox.showerror("Timezone Error", f"An unexpected error occurred initializing timezone: {e}")
-        return False
-
-def convert_utc_to_vn_str(utc_iso_string, fmt='%Y-%m-%d %H:%M:%S', log_func=print):
+    tz = None
+    if ZoneInfo is not None:
+        try:
+            tz = ZoneInfo(VIETNAM_TZ_STR)
+            log_func(f"Timezone '{VIETNAM_TZ_STR}' loaded successfully.")
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            log_func(f"WARNING: Timezone '{VIETNAM_TZ_STR}' not found ({e}). Install 'tzdata' (`pip install tzdata`) for the full zone database.")
+    if tz is None:
+        # Vietnam has no DST, so a fixed offset gives the same results as the zone database.
+        tz = datetime.timezone(datetime.timedelta(hours=VIETNAM_UTC_OFFSET_HOURS), VIETNAM_TZ_STR)
+        log_func(f"Using fixed UTC+{VIETNAM_UTC_OFFSET_HOURS} offset for '{VIETNAM_TZ_STR}'.")
+    vietnam_tz = tz
+    _utc_iso_to_vn.cache_clear()
+    _vn_str_to_utc.cache_clear()
+    return True
+
+# Scheduled times repeat across refreshes and reports, so conversions are memoised per (input, format).
+@lru_cache(maxsize=4096)
+def _utc_iso_to_vn(utc_iso_string, fmt):
+    utc_dt = datetime.datetime.fromisoformat(utc_iso_string.replace('Z', '+00:00'))
+    return utc_dt.astimezone(vietnam_tz).strftime(fmt)
+
+@lru_cache(maxsize=1024)
+def _vn_str_to_utc(vn_time_str, fmt):
+    naive_dt = datetime.datetime.strptime(vn_time_str, fmt)
+    utc_dt = naive_dt.replace(tzinfo=vietnam_tz).astimezone(datetime.timezone.utc)
+    return utc_dt, utc_dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def convert_utc_to_vn_str(utc_iso_string, fmt=VN_TIME_FORMAT, log_func=print):
     if not vietnam_tz:
-        initialize_timezone(log_func) # Ensure it's initialized
-    if not utc_iso_string or not vietnam_tz:
+        initialize_timezone(log_func)
+    if not utc_iso_string:
         return "N/A"
     try:
-        utc_dt = datetime.datetime.fromisoformat(utc_iso_string.replace('Z', '+00:00'))
-        vn_dt = utc_dt.astimezone(vietnam_tz)
-        return vn_dt.strftime(fmt)
-    except (ValueError, TypeError) as e:
+        return _utc_iso_to_vn(utc_iso_string, fmt)
+    except (ValueError, TypeError, AttributeError) as e:
         log_func(f"Error converting UTC string '{utc_iso_string}' to VN time: {e}")
         return "Invalid Date"
 
-def convert_vn_str_to_utc_iso(vn_time_str, fmt='%Y-%m-%d %H:%M:%S', log_func=print):
+def convert_utc_list_to_vn_str(utc_iso_strings, fmt=VN_TIME_FORMAT, log_func=print):
+    # One call for a whole list (table rows, reports); repeated values hit the cache.
     if not vietnam_tz:
-        initialize_timezone(log_func) # Ensure it's initialized
+        initialize_timezone(log_func)
+    results = []
+    for utc_iso_string in utc_iso_strings:
+        if not utc_iso_string:
+            results.append("N/A")
+            continue
+        try:
+            results.append(_utc_iso_to_vn(utc_iso_string, fmt))
+        except (ValueError, TypeError, AttributeError) as e:
+            log_func(f"Error converting UTC string '{utc_iso_string}' to VN time: {e}")
+            results.append("Invalid Date")
+    return results
+
+def convert_vn_str_to_utc_iso(vn_time_str, fmt=VN_TIME_FORMAT, log_func=print):
+    # Returns (utc_datetime, 'YYYY-MM-DDTHH:MM:SSZ'), or (None, None) if the string does not match fmt.
     if not vietnam_tz:
-        log_func("Error: Vietnam timezone not initialized for VN to UTC conversion.")
-        return None, None
+        initialize_timezone(log_func)
     try:
-        naive_dt = datetime.datetime.strptime(vn_time_str, fmt)
-        vn_dt = vietnam_tz.localize(naive_dt)
-        utc_dt = vn_dt.astimezone(pytz.utc)
-        utc_iso_str = utc_dt.strftime('%Y-%m-%dT%H:%M:%SZ')
-        return utc_dt, utc_iso_str
-    except ValueError:
-        log_func(f"Invalid VN time format: '{vn_time_str}'. Expected: '{fmt}'")
-        messagebox.showerror("Invalid Time Format",
-                             f"Invalid time format.\nPlease use: {fmt} (Vietnam Time).")
+        return _vn_str_to_utc(vn_time_str, fmt)
+    except (ValueError, TypeError) as e:
+        log_func(f"Invalid VN time format: '{vn_time_str}'. Expected: '{fmt}' ({e})")
         return None, None
-    except Exception as e:
-        log_func(f"Error converting VN time string '{vn_time_str}' to UTC: {e}")
-        messagebox.showerror("Time Conversion Error", f"Error converting time: {e}")
-        return None, None
\ No newline at end of file
@@ -0,0 +1,193 @@
+# upload_engine.py
+import itertools
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from youtube_api import upload_video, UploadCancelledError
+
+class BandwidthLimiter:
+    # Shared pacing for all uploads: each chunk reserves its share of the byte budget
+    # and waits until the reservation comes due.
+    def __init__(self, bytes_per_second=0):
+        self._lock = threading.Lock()
+        self._rate = bytes_per_second
+        self._next_free = time.monotonic()
+
+    def set_rate(self, bytes_per_second):
+        with self._lock:
+            self._rate = bytes_per_second
+            self._next_free = time.monotonic()
+
+    def throttle(self, nbytes, cancel_event=None):
+        with self._lock:
+            if not self._rate or self._rate <= 0 or nbytes <= 0:
+                return True
+            now = time.monotonic()
+            start = max(self._next_free, now)
+            self._next_free = start + nbytes / self._rate
+            wait = start - now
+        if wait <= 0:
+            return True
+        if cancel_event:
+            return not cancel_event.wait(timeout=wait)
+        time.sleep(wait)
+        return True
+
+class UploadJob:
+    def __init__(self, job_id, video_path, title, description, thumbnail_path, publish_time_utc_iso, context,
+                 on_progress, on_done):
+        self.job_id = job_id
+        self.video_path = video_path
+        self.title = title
+        self.description = description
+        self.thumbnail_path = thumbnail_path
+        self.publish_time_utc_iso = publish_time_utc_iso
+        self.context = context # Opaque caller data, e.g. the scheduled post id
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.cancel_event = threading.Event()
+        self.state = 'queued' # queued, running, done, failed, cancelled
+        self.progress = 0.0
+        self.bytes_sent = 0
+        self.total_bytes = 0
+        self.resumed_from = 0 # Bytes already committed by a saved session before this run
+        self.response = None
+        self.warning = None # Non-fatal problem, e.g. the thumbnail could not be set
+        self.error = None
+        self.exception = None
+        self.future = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+class UploadEngine:
+    def __init__(self, max_workers=3, bandwidth_limit_bytes_per_sec=0, log_func=print):
+        self.log_func = log_func
+        self.max_workers = max(1, int(max_workers))
+        self.bandwidth_limit_bytes_per_sec = bandwidth_limit_bytes_per_sec
+        self.bandwidth_limiter = BandwidthLimiter(bandwidth_limit_bytes_per_sec)
+        self._throughput_samples = deque(maxlen=10) # Bytes/sec of recently finished uploads
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="upload")
+        self._jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._closed = False
+
+    def submit(self, video_path, title, description='', thumbnail_path=None, publish_time_utc_iso=None,
+               context=None, on_progress=None, on_done=None):
+        job = UploadJob(next(self._ids), video_path, title, description, thumbnail_path,
+                        publish_time_utc_iso, context, on_progress, on_done)
+        with self._jobs_lock:
+            if self._closed:
+                raise RuntimeError("Upload engine is shut down.")
+            self._jobs[job.job_id] = job
+            job.future = self._executor.submit(self._run_job, job)
+        self.log_func(f"UploadEngine: Queued job {job.job_id} for '{title}'.")
+        return job
+
+    def get_job(self, job_id):
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    def active_count(self):
+        with self._jobs_lock:
+            return sum(1 for job in self._jobs.values() if job.state in ('queued', 'running'))
+
+    def estimated_throughput(self, default=None):
+        with self._jobs_lock:
+            samples = list(self._throughput_samples)
+        estimate = statistics.median(samples) if samples else default
+        if estimate and self.bandwidth_limit_bytes_per_sec:
+            estimate = min(estimate, self.bandwidth_limit_bytes_per_sec)
+        return estimate
+
+    def _record_throughput(self, job):
+        if job.state != 'done' or not job.total_bytes or not job.started_at:
+            return
+        duration = job.finished_at - job.started_at
+        if duration < 1.0 or job.total_bytes <= job.resumed_from:
+            return
+        throughput = (job.total_bytes - job.resumed_from) / duration
+        with self._jobs_lock:
+            self._throughput_samples.append(throughput)
+        self.log_func(f"UploadEngine: Job {job.job_id} averaged {throughput / (1024 * 1024):.2f} MB/s.")
+
+    def cancel(self, job_id):
+        job = self.get_job(job_id)
+        if not job or job.state not in ('queued', 'running'):
+            return False
+        job.cancel_event.set()
+        self.log_func(f"UploadEngine: Cancellation requested for job {job_id} ('{job.title}').")
+        return True
+
+    def cancel_all(self):
+        for job in self.jobs():
+            if job.state in ('queued', 'running'):
+                job.cancel_event.set()
+
+    def shutdown(self, cancel=True, wait=False):
+        with self._jobs_lock:
+            self._closed = True
+        if cancel:
+            self.cancel_all()
+        self._executor.shutdown(wait=wait)
+
+    def _report_progress(self, job, info):
+        job.progress = info.get('progress', job.progress)
+        job.bytes_sent = info.get('bytes_sent', job.bytes_sent)
+        job.total_bytes = info.get('total_bytes', job.total_bytes)
+        job.resumed_from = info.get('resumed_from', job.resumed_from)
+        if job.on_progress:
+            try:
+                job.on_progress(job, info)
+            except Exception as e:
+                self.log_func(f"UploadEngine: Progress callback error for job {job.job_id}: {e}")
+
+    def _run_job(self, job):
+        if job.cancelled:
+            job.state = 'cancelled'
+        else:
+            job.state = 'running'
+            job.started_at = time.monotonic()
+            try:
+                job.response, job.warning = upload_video(
+                    job.video_path, job.title, job.description, job.thumbnail_path,
+                    publish_time_utc_iso=job.publish_time_utc_iso,
+                    log_func=self.log_func,
+                    progress_callback=lambda info: self._report_progress(job, info),
+                    cancel_event=job.cancel_event,
+                    bandwidth_limiter=self.bandwidth_limiter
+                )
+            except UploadCancelledError:
+                pass
+            except Exception as e:
+                job.error = str(e)
+                job.exception = e
+                self.log_func(f"UploadEngine: Job {job.job_id} ('{job.title}') raised: {e}")
+            if job.response and 'id' in job.response:
+                job.state = 'done'
+            elif job.cancelled:
+                job.state = 'cancelled'
+            else:
+                job.state = 'failed'
+            job.finished_at = time.monotonic()
+            self._record_throughput(job)
+        self.log_func(f"UploadEngine: Job {job.job_id} ('{job.title}') finished: {job.state}.")
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                self.log_func(f"UploadEngine: Completion callback error for job {job.job_id}: {e}")
+        with self._jobs_lock:
+            self._jobs.pop(job.job_id, None)
+        return job
@@ -0,0 +1,75 @@
+# upload_sessions.py
+import os
+import json
+import time
+import hashlib
+import threading
+
+from config import UPLOAD_SESSIONS_FILE, UPLOAD_SESSION_MAX_AGE_SECONDS
+from file_handler import write_json_atomic
+
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024
+
+_sessions_lock = threading.Lock()
+_sessions = None
+
+def file_fingerprint(path):
+    # Size + mtime + hash of the head and tail: cheap even for multi-GB files.
+    stat = os.stat(path)
+    digest = hashlib.sha1(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if stat.st_size > FINGERPRINT_SAMPLE_BYTES:
+            f.seek(max(stat.st_size - FINGERPRINT_SAMPLE_BYTES, FINGERPRINT_SAMPLE_BYTES))
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+def session_key(fingerprint, body):
+    # The session was opened with this metadata, so an edited post must not reuse it.
+    body_json = json.dumps(body, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(f"{fingerprint}|{body_json}".encode('utf-8')).hexdigest()
+
+def _load_locked(log_func=print):
+    global _sessions
+    if _sessions is None:
+        _sessions = {}
+        if os.path.exists(UPLOAD_SESSIONS_FILE):
+            try:
+                with open(UPLOAD_SESSIONS_FILE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    _sessions = data
+            except (OSError, ValueError) as e:
+                log_func(f"Upload sessions: Could not read '{UPLOAD_SESSIONS_FILE}': {e}. Starting empty.")
+        cutoff = time.time() - UPLOAD_SESSION_MAX_AGE_SECONDS
+        for key in [k for k, v in _sessions.items() if v.get('updated_at', 0) < cutoff]:
+            del _sessions[key]
+    return _sessions
+
+def _persist_locked(log_func=print):
+    try:
+        write_json_atomic(_sessions, UPLOAD_SESSIONS_FILE, keep_backups=False)
+    except OSError as e:
+        log_func(f"Upload sessions: Could not save '{UPLOAD_SESSIONS_FILE}': {e}")
+
+def get_session(key, log_func=print):
+    with _sessions_lock:
+        entry = _load_locked(log_func).get(key)
+        return dict(entry) if entry else None
+
+def save_session(key, session_uri, offset, fingerprint, video_path, title, log_func=print):
+    with _sessions_lock:
+        _load_locked(log_func)[key] = {
+            'session_uri': session_uri,
+            'offset': offset,
+            'fingerprint': fingerprint,
+            'video_path': video_path,
+            'title': title,
+            'updated_at': time.time(),
+        }
+        _persist_locked(log_func)
+
+def remove_session(key, log_func=print):
+    with _sessions_lock:
+        if _load_locked(log_func).pop(key, None) is not None:
+            _persist_locked(log_func)
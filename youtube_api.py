@@ -2,19 +2,114 @@
 import os
 import time
 import json # For parsing HttpError content
-from tkinter import messagebox
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 
-from auth import get_authenticated_service
-from config import API_SERVICE_NAME, API_VERSION
+import upload_sessions
+from api_retry import call_with_retry
+from response_cache import execute_cached
+from log_pipeline import log_verbose
+from auth import get_authenticated_service, require_authenticated_service
+from config import (API_SERVICE_NAME, API_VERSION, UPLOAD_CHUNK_SIZE, UPLOAD_CHUNK_SIZE_MIN,
+                    UPLOAD_CHUNK_SIZE_MAX, UPLOAD_CHUNK_TARGET_SECONDS, VIDEOS_LIST_MAX_IDS,
+                    STATS_MAX_CONCURRENT_REQUESTS, TRENDING_MAX_RESULTS_PER_REGION, TRENDING_PAGE_SIZE,
+                    TRENDING_MAX_CONCURRENT_REGIONS)
 
-def upload_video(video_file_path, title, description, thumbnail_path=None, publish_time_utc_iso=None, log_func=print):
-    youtube = get_authenticated_service(API_SERVICE_NAME, API_VERSION, log_func)
-    if not youtube:
-        log_func("Upload Error: YouTube service object is invalid (authentication failed).")
-        messagebox.showerror("Upload Error", "Authentication is needed or has failed for upload scopes.")
-        return None
+CHUNK_GRANULARITY = 256 * 1024 # Resumable upload chunks must be multiples of 256 KiB
+
+# Raised by upload_video instead of showing dialogs; callers decide how to surface them (tabs via root.after).
+# The trending, comment and stats helpers report per-item failures as (result, error) pairs instead.
+class YouTubeAPIError(Exception):
+    pass
+
+class UploadError(YouTubeAPIError):
+    pass
+
+class UploadCancelledError(YouTubeAPIError):
+    pass
+
+class AdaptiveMediaFileUpload(MediaFileUpload):
+    # next_chunk() reads chunksize() before every chunk, so it can change mid-upload.
+    def set_chunksize(self, chunksize):
+        self._chunksize = chunksize
+
+class ChunkSizer:
+    def __init__(self, initial=UPLOAD_CHUNK_SIZE, minimum=UPLOAD_CHUNK_SIZE_MIN, maximum=UPLOAD_CHUNK_SIZE_MAX,
+                 target_seconds=UPLOAD_CHUNK_TARGET_SECONDS):
+        self.minimum = self._align(minimum)
+        self.maximum = self._align(maximum)
+        self.target_seconds = target_seconds
+        self.chunk_size = self._clamp(initial)
+        self.throughput = None # Smoothed bytes/sec
+        self.last_latency = None
+
+    @staticmethod
+    def _align(size):
+        return max(CHUNK_GRANULARITY, int(size) // CHUNK_GRANULARITY * CHUNK_GRANULARITY)
+
+    def _clamp(self, size):
+        return min(max(self._align(size), self.minimum), self.maximum)
+
+    def record_success(self, bytes_sent, seconds):
+        self.last_latency = seconds
+        if bytes_sent <= 0 or seconds <= 0:
+            return self.chunk_size
+        sample = bytes_sent / seconds
+        self.throughput = sample if self.throughput is None else 0.5 * self.throughput + 0.5 * sample
+        # Grow at most 2x per chunk so one lucky sample cannot jump straight to the maximum.
+        target = min(self.throughput * self.target_seconds, self.chunk_size * 2)
+        self.chunk_size = self._clamp(target)
+        return self.chunk_size
+
+    def record_failure(self):
+        self.chunk_size = self._clamp(self.chunk_size // 2)
+        return self.chunk_size
+
+    def mb_per_sec(self):
+        return self.throughput / (1024 * 1024) if self.throughput else 0.0
+
+def _query_upload_session(request, session_uri, total_size):
+    # An empty PUT with 'bytes */total' asks the server how much of the session it has committed.
+    resp, content = call_with_retry(lambda: request.http.request(
+        session_uri, method='PUT',
+        headers={'Content-Range': f'bytes */{total_size}', 'Content-Length': '0'}
+    ), 'videos.insert session query')
+    if resp.status in (200, 201):
+        return 'complete', json.loads(content.decode('utf-8') if isinstance(content, bytes) else content)
+    if resp.status == 308:
+        range_header = resp.get('range')
+        return 'incomplete', int(range_header.split('-')[1]) + 1 if range_header else 0
+    return 'expired', None
+
+def _resume_saved_session(request, media, key, title, log_func=print):
+    saved = upload_sessions.get_session(key, log_func)
+    if not saved:
+        return None, 0
+    try:
+        state, value = _query_upload_session(request, saved['session_uri'], media.size())
+    except Exception as e:
+        log_func(f"Could not query saved upload session for '{title}': {e}. Starting a new session.")
+        upload_sessions.remove_session(key, log_func)
+        return None, 0
+    if state == 'complete':
+        log_func(f"Saved upload session for '{title}' had already completed.")
+        return value, media.size()
+    if state == 'incomplete':
+        request.resumable_uri = saved['session_uri']
+        request.resumable_progress = value
+        log_func(f"Resuming upload of '{title}' at byte {value:,} of {media.size():,}.")
+        return None, value
+    log_func(f"Saved upload session for '{title}' has expired. Starting a new session.")
+    upload_sessions.remove_session(key, log_func)
+    return None, 0
+
+def upload_video(video_file_path, title, description, thumbnail_path=None, publish_time_utc_iso=None, log_func=print,
+                 progress_callback=None, cancel_event=None, bandwidth_limiter=None):
+    # Returns (response, thumbnail_warning); thumbnail_warning is None unless the video went up
+    # but its thumbnail did not. Raises AuthenticationError, UploadCancelledError or UploadError.
+    youtube = require_authenticated_service(API_SERVICE_NAME, API_VERSION, log_func)
 
     body = {
         'snippet': {
@@ -30,37 +125,75 @@ def upload_video(video_file_path, title, description, thumbnail_path=None, publi
     }
     log_func(f"Starting upload: '{title}' (Schedule: {publish_time_utc_iso if publish_time_utc_iso else 'Immediate'})")
     try:
-        media = MediaFileUpload(video_file_path, mimetype='video/*', resumable=True)
+        chunk_sizer = ChunkSizer()
+        media = AdaptiveMediaFileUpload(video_file_path, mimetype='video/*', chunksize=chunk_sizer.chunk_size, resumable=True)
         request = youtube.videos().insert(
             part='snippet,status',
             body=body,
             media_body=media
         )
+        fingerprint = upload_sessions.file_fingerprint(video_file_path)
+        session_key = upload_sessions.session_key(fingerprint, body)
+        response, resumed_from = _resume_saved_session(request, media, session_key, title, log_func)
 
-        response = None
         last_progress = -1
         while response is None:
+            if cancel_event and cancel_event.is_set():
+                raise UploadCancelledError(f"Upload of '{title}' was cancelled.")
+            if bandwidth_limiter:
+                bytes_next = min(media.chunksize(), media.size() - request.resumable_progress)
+                if not bandwidth_limiter.throttle(bytes_next, cancel_event):
+                    raise UploadCancelledError(f"Upload of '{title}' was cancelled.")
             try:
-                status, response = request.next_chunk()
+                progress_before = request.resumable_progress
+                chunk_started = time.monotonic()
+                status, response = call_with_retry(
+                    request.next_chunk, 'videos.insert chunk', log_func,
+                    cancel_event=cancel_event,
+                    on_retry=lambda error: media.set_chunksize(chunk_sizer.record_failure())
+                )
+                media.set_chunksize(chunk_sizer.record_success(
+                    (status.resumable_progress if status else media.size()) - progress_before,
+                    time.monotonic() - chunk_started
+                ))
                 if status:
                     progress = int(status.progress() * 100)
                     if progress > last_progress:
-                       log_func(f"Uploading '{title}': {progress}%")
+                       log_verbose(log_func, lambda: f"Uploading '{title}': {progress}% ({chunk_sizer.mb_per_sec():.2f} MB/s, chunk {chunk_sizer.chunk_size // 1024} KiB)")
                        last_progress = progress
+                    upload_sessions.save_session(session_key, request.resumable_uri, status.resumable_progress,
+                                                 fingerprint, video_file_path, title, log_func)
+                    if progress_callback:
+                        progress_callback({
+                            'progress': status.progress(),
+                            'bytes_sent': status.resumable_progress,
+                            'total_bytes': status.total_size,
+                            'resumed_from': resumed_from,
+                            'chunk_size': chunk_sizer.chunk_size,
+                            'mb_per_sec': chunk_sizer.mb_per_sec(),
+                        })
             except HttpError as http_error_chunk:
-                if http_error_chunk.resp.status in [500, 502, 503, 504]:
-                    log_func(f"Resumable upload error for '{title}': {http_error_chunk}. Retrying...")
-                    time.sleep(random.randint(1,5)) # Add some jitter
-                else:
-                    log_func(f"Non-resumable API Error during upload chunk for '{title}': {http_error_chunk}")
-                    raise
+                if cancel_event and cancel_event.is_set():
+                    raise UploadCancelledError(f"Upload of '{title}' was cancelled.")
+                log_func(f"API Error during upload chunk for '{title}' (retries exhausted or not retryable): {http_error_chunk}")
+                if http_error_chunk.resp.status in [404, 410]:
+                    upload_sessions.remove_session(session_key, log_func)
+                raise
             except Exception as chunk_error:
+                 if cancel_event and cancel_event.is_set():
+                     raise UploadCancelledError(f"Upload of '{title}' was cancelled.")
                  log_func(f"Error during upload chunk for '{title}': {chunk_error}")
                  raise
 
+        upload_sessions.remove_session(session_key, log_func)
+        if progress_callback:
+            progress_callback({'progress': 1.0, 'bytes_sent': media.size(), 'total_bytes': media.size(),
+                               'resumed_from': resumed_from, 'chunk_size': chunk_sizer.chunk_size,
+                               'mb_per_sec': chunk_sizer.mb_per_sec()})
         video_id = response['id']
         log_func(f"Successfully uploaded video '{title}'. Video ID: {video_id}")
 
+        thumbnail_warning = None
         if thumbnail_path and os.path.exists(thumbnail_path):
             try:
                 log_func(f"Starting thumbnail upload for video ID: {video_id}")
@@ -68,58 +201,97 @@ def upload_video(video_file_path, title, description, thumbnail_path=None, publi
                     videoId=video_id,
                     media_body=MediaFileUpload(thumbnail_path, mimetype='image/*')
                 )
-                request_thumbnail.execute()
+                call_with_retry(request_thumbnail.execute, 'thumbnails.set', log_func)
                 log_func(f"Successfully uploaded thumbnail for video ID: {video_id}")
             except HttpError as e_thumb_http:
                  log_func(f"API error uploading thumbnail for video ID {video_id}: {e_thumb_http}")
-                 messagebox.showwarning("Thumbnail Error", f"Could not upload thumbnail for '{title}':\n{e_thumb_http}\nVideo was uploaded successfully.")
+                 thumbnail_warning = f"Could not upload thumbnail for '{title}':\n{e_thumb_http}\nVideo was uploaded successfully."
             except Exception as e_thumb:
                  log_func(f"Error uploading thumbnail for video ID {video_id}: {e_thumb}")
-                 messagebox.showwarning("Thumbnail Error", f"Could not upload thumbnail for '{title}':\n{e_thumb}")
+                 thumbnail_warning = f"Could not upload thumbnail for '{title}':\n{e_thumb}"
         elif thumbnail_path:
              log_func(f"Thumbnail file not found, skipping: {thumbnail_path}")
-             messagebox.showwarning("Thumbnail Warning", f"Thumbnail file not found:\n{thumbnail_path}\nSkipping thumbnail upload for '{title}'.")
-        return response
+             thumbnail_warning = f"Thumbnail file not found:\n{thumbnail_path}\nSkipping thumbnail upload for '{title}'."
+        return response, thumbnail_warning
 
+    except UploadCancelledError as cancel_error:
+        log_func(f"Upload cancelled: {cancel_error}")
+        raise
     except FileNotFoundError as fnf_error:
         log_func(f"File Error during upload setup for '{title}': {fnf_error}")
-        messagebox.showerror("File Error", f"File not found:\n{fnf_error}")
-        return None
+        raise UploadError(f"File not found:\n{fnf_error}") from fnf_error
     except HttpError as http_error:
         log_func(f"API Error during upload '{title}': {http_error}")
-        messagebox.showerror("API Error", f"Could not upload video '{title}':\n{http_error}")
-        return None
+        raise UploadError(f"Could not upload video '{title}':\n{http_error}") from http_error
     except Exception as e:
         log_func(f"General Error during upload '{title}': {e}")
-        messagebox.showerror("Upload Error", f"An unexpected error occurred uploading '{title}':\n{e}")
-        return None
+        raise UploadError(f"An unexpected error occurred uploading '{title}':\n{e}") from e
 
-def fetch_trending_videos(region_code, max_results=25, log_func=print):
-    youtube = get_authenticated_service(API_SERVICE_NAME, API_VERSION, log_func)
-    if not youtube:
-        log_func("Trending: Authentication failed for readonly scopes.")
-        return None
-
-    log_func(f"Fetching trending videos for region: {region_code}...")
-    try:
+def _iter_trending_pages(youtube, region_code, max_results, log_func=print):
+    fetched, page_token = 0, None
+    while fetched < max_results:
         request = youtube.videos().list(
             part="snippet,statistics",
             chart="mostPopular",
             regionCode=region_code,
-            maxResults=max_results
+            maxResults=min(TRENDING_PAGE_SIZE, max_results - fetched),
+            pageToken=page_token
         )
-        response = request.execute()
+        response = execute_cached(request, 'videos.list (trending)', log_func)
         items = response.get('items', [])
-        log_func(f"Fetched {len(items)} trending videos for region: {region_code}")
-        return items
-    except HttpError as e:
-        log_func(f"API Error fetching trending videos for '{region_code}': {e}")
-        messagebox.showerror("API Error", f"Could not fetch trending videos for region '{region_code}':\n{e}")
-        return None
-    except Exception as e:
-        log_func(f"Error fetching trending videos for '{region_code}': {e}")
-        messagebox.showerror("Error", f"An error occurred fetching trending videos: {e}")
-        return None
+        fetched += len(items)
+        yield items
+        page_token = response.get('nextPageToken')
+        if not page_token or not items:
+            break
+
+def fetch_trending_videos_multi(region_codes, max_per_region=TRENDING_MAX_RESULTS_PER_REGION, on_page=None,
+                                log_func=print, max_workers=TRENDING_MAX_CONCURRENT_REGIONS):
+    # Fetches every region concurrently and de-duplicates videos trending in several regions.
+    # on_page(region, new_videos, repeated_videos) is called from worker threads as each page arrives;
+    # every video dict carries a 'regions' list. Returns (videos, {region: error}).
+    region_codes = list(dict.fromkeys(region_codes))
+    youtube = get_authenticated_service(API_SERVICE_NAME, API_VERSION, log_func)
+    if not youtube:
+        log_func("Trending: Authentication failed for readonly scopes.")
+        return None, {region: "Authentication failed" for region in region_codes}
+
+    merge_lock = threading.Lock()
+    videos_by_id = {}
+    errors = {}
+
+    def fetch_region(region_code):
+        log_func(f"Fetching trending videos for region: {region_code}...")
+        count = 0
+        try:
+            for page_items in _iter_trending_pages(youtube, region_code, max_per_region, log_func):
+                new_videos, repeated_videos = [], []
+                with merge_lock:
+                    for item in page_items:
+                        video_id = item.get('id')
+                        existing = videos_by_id.get(video_id)
+                        if existing:
+                            if region_code not in existing['regions']:
+                                existing['regions'].append(region_code)
+                            repeated_videos.append(existing)
+                        else:
+                            video = dict(item) # Cached response bodies must not be mutated
+                            video['regions'] = [region_code]
+                            videos_by_id[video_id] = video
+                            new_videos.append(video)
+                count += len(page_items)
+                if on_page:
+                    on_page(region_code, new_videos, repeated_videos)
+            log_func(f"Fetched {count} trending videos for region: {region_code}")
+        except Exception as e:
+            log_func(f"API Error fetching trending videos for '{region_code}': {e}")
+            with merge_lock:
+                errors[region_code] = str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(region_codes)))) as executor:
+        list(executor.map(fetch_region, region_codes))
+    log_func(f"Trending: {len(videos_by_id)} unique videos across {len(region_codes)} region(s).")
+    return list(videos_by_id.values()), errors
 
 def post_comment(video_id, comment_text, log_func=print):
     youtube = get_authenticated_service(API_SERVICE_NAME, API_VERSION, log_func)
@@ -143,7 +315,8 @@ def post_comment(video_id, comment_text, log_func=print):
             part="snippet",
             body=request_body
         )
-        response = request.execute()
+        # Not idempotent: only retried when the server throttled the request before creating anything.
+        response = call_with_retry(request.execute, 'commentThreads.insert', log_func, idempotent=False)
         log_func(f"Successfully posted comment on Video ID {video_id}. Comment ID: {response['id']}")
         return response, None
 
@@ -184,7 +357,7 @@ def fetch_video_stats(video_id, log_func=print):
             part="snippet,statistics",
             id=video_id
         )
-        response = request.execute()
+        response = execute_cached(request, 'videos.list (stats)', log_func)
 
         items = response.get('items', [])
         if not items:
@@ -196,15 +369,57 @@ def fetch_video_stats(video_id, log_func=print):
 
     except HttpError as e:
         log_func(f"API Error fetching stats for Video ID {video_id}: {e}")
-        error_detail = f"API Error: {e}"
-        try:
-            error_content = e.content.decode('utf-8')
-            error_json = json.loads(error_content)
-            error_message_detail = error_json.get('error', {}).get('message', str(e))
-            error_detail = f"API Error: {error_message_detail}"
-        except Exception:
-            pass
-        return None, error_detail
+        return None, _stats_error_detail(e)
     except Exception as e:
         log_func(f"General Error fetching stats for Video ID {video_id}: {e}")
-        return None, f"Unexpected Error: {e}"
\ No newline at end of file
+        return None, f"Unexpected Error: {e}"
+
+def _stats_error_detail(e):
+    error_detail = f"API Error: {e}"
+    try:
+        error_content = e.content.decode('utf-8')
+        error_json = json.loads(error_content)
+        error_message_detail = error_json.get('error', {}).get('message', str(e))
+        error_detail = f"API Error: {error_message_detail}"
+    except Exception:
+        pass
+    return error_detail
+
+def _fetch_stats_batch(youtube, batch_ids, log_func=print):
+    try:
+        request = youtube.videos().list(
+            part="snippet,statistics",
+            id=",".join(batch_ids)
+        )
+        response = execute_cached(request, 'videos.list (stats batch)', log_func)
+    except HttpError as e:
+        log_func(f"API Error fetching stats batch of {len(batch_ids)} videos: {e}")
+        error_detail = _stats_error_detail(e)
+        return {video_id: (None, error_detail) for video_id in batch_ids}
+    except Exception as e:
+        log_func(f"General Error fetching stats batch of {len(batch_ids)} videos: {e}")
+        return {video_id: (None, f"Unexpected Error: {e}") for video_id in batch_ids}
+
+    found = {item.get('id'): item for item in response.get('items', [])}
+    return {video_id: (found[video_id], None) if video_id in found else (None, "Video not found")
+            for video_id in batch_ids}
+
+def fetch_video_stats_many(video_ids, log_func=print, max_workers=STATS_MAX_CONCURRENT_REQUESTS):
+    # One videos.list call (1 quota unit) per 50 IDs. Returns {video_id: (item, error)}.
+    unique_ids = list(dict.fromkeys(v for v in video_ids if v))
+    if not unique_ids:
+        return {}
+    youtube = get_authenticated_service(API_SERVICE_NAME, API_VERSION, log_func)
+    if not youtube:
+        log_func(f"Analytics Error: Authentication failed ({len(unique_ids)} videos).")
+        return {video_id: (None, "Authentication failed") for video_id in unique_ids}
+
+    batches = [unique_ids[i:i + VIDEOS_LIST_MAX_IDS] for i in range(0, len(unique_ids), VIDEOS_LIST_MAX_IDS)]
+    log_func(f"Fetching stats for {len(unique_ids)} videos in {len(batches)} request(s)...")
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+        for batch_result in executor.map(lambda batch: _fetch_stats_batch(youtube, batch, log_func), batches):
+            results.update(batch_result)
+    failed = sum(1 for _, error in results.values() if error)
+    log_func(f"Fetched stats for {len(results) - failed}/{len(results)} videos.")
+    return results
\ No newline at end of file
@@ -14,11 +14,8 @@ import queue
 import pytz
 import random
 from ttkthemes import ThemedTk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
-import matplotlib.ticker as mticker
 import math
+# matplotlib and pandas are imported inside the analytics functions; they dominate startup time.
 #   Constants and Globals
 CLIENT_SECRETS_FILE = 'client_secret.json'
 UPLOAD_READONLY_SCOPES = [
@@ -1164,6 +1161,7 @@ def clear_analytics_results():
     if canvas_widget:
         canvas_widget.get_tk_widget().destroy()
         canvas_widget = None
+        import matplotlib.pyplot as plt
         plt.close('all')
     if analytics_report_text:
         analytics_report_text.config(state=tk.NORMAL)
@@ -1267,6 +1265,10 @@ def display_analysis_results(video_data, error, display_identifier):
 
     if analytics_chart_frame:
         try:
+            import matplotlib.pyplot as plt
+            import matplotlib.ticker as mticker
+            import pandas as pd
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
             data = {'Metric': ['Views', 'Likes', 'Comments'],
                     'Count': [views, likes, comments]}
             df = pd.DataFrame(data)